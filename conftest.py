@@ -0,0 +1,15 @@
+"""
+Pytest bootstrap: make the repository root importable so the tests can use
+package imports (from v1 import ...) without per-file sys.path edits.
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+# test_n2_debug.py is a runnable debug script, not a test module: it has no
+# test functions and does all its work (including a full activation pass)
+# at import time, so keep it out of collection. Run it directly instead:
+# python3 v1/tests/test_n2_debug.py
+collect_ignore = [os.path.join("v1", "tests", "test_n2_debug.py")]
@@ -3,6 +3,7 @@ Stage 4: Chain Filtering
 Removes useless "string" chains and keeps only meaningful boundaries.
 """
 
+import numpy as np
 from typing import List
 
 try:
@@ -10,6 +11,52 @@ try:
 except ImportError:
     from utils import Chain
 
+try:
+    from numba import njit
+    HAVE_NUMBA = True
+except ImportError:
+    HAVE_NUMBA = False
+
+# Below this many chains the NumPy expression is already cheap enough that
+# kernel dispatch overhead isn't worth it.
+_NUMBA_MIN_CHAINS = 1024
+
+
+if HAVE_NUMBA:
+    # Eager signature: compiled (or loaded from the on-disk cache) at import
+    # instead of on the first large chain list mid-pipeline
+    @njit('b1[:](i4[:], b1[:], b1[:], i4[:], i4[:], i4[:], i4[:], '
+          'i8, i8, i8)', cache=True)
+    def _keep_mask_kernel(lengths, loops, spliced, si, sj, ei, ej,
+                          grid_height, grid_width, min_length):
+        """Fused keep-mask: one pass, no NumPy temporaries."""
+        h1 = grid_height - 1
+        w1 = grid_width - 1
+        out = np.empty(lengths.size, np.bool_)
+        for k in range(lengths.size):
+            out[k] = lengths[k] >= min_length and (
+                loops[k] or spliced[k] or
+                si[k] == 0 or si[k] == h1 or sj[k] == 0 or sj[k] == w1 or
+                ei[k] == 0 or ei[k] == h1 or ej[k] == 0 or ej[k] == w1)
+        return out
+
+
+class FilteredChains(list):
+    """
+    List of kept chains whose membership test tries object identity first.
+
+    Callers almost always ask `chain in filtered` with the very Chain
+    objects they passed in; the identity scan answers that without the
+    dataclass equality walk over every step and tile list. Misses fall
+    back to normal list equality, so semantics are unchanged.
+    """
+
+    def __contains__(self, chain) -> bool:
+        for c in self:
+            if c is chain:
+                return True
+        return super().__contains__(chain)
+
 
 def filter_chains(
     chains: List[Chain],
@@ -40,35 +87,41 @@ def filter_chains(
     Returns:
         Filtered list of chains
     """
-    filtered = []
-
-    for chain in chains:
-        # Skip chains that are too short
-        if len(chain) < min_length:
-            continue
-
-        # Keep if it's a loop
-        if chain.is_loop():
-            filtered.append(chain)
-            continue
-
-        # Keep if it was created via splicing
-        if chain.spliced:
-            filtered.append(chain)
-            continue
-
-        # Keep if start or end touches border
-        if _touches_border(chain.start_pos, grid_height, grid_width):
-            filtered.append(chain)
-            continue
-
-        if _touches_border(chain.end_pos, grid_height, grid_width):
-            filtered.append(chain)
-            continue
-
-        # Otherwise drop this chain (floating string)
-
-    return filtered
+    if not chains:
+        return FilteredChains()
+
+    n = len(chains)
+
+    # Materialize per-chain predicates as contiguous arrays once, then
+    # evaluate the whole keep-mask with SIMD-friendly array ops instead of
+    # Python branches per chain.
+    lengths = np.fromiter((len(c) for c in chains), dtype=np.int32, count=n)
+    loops = np.fromiter((c.is_loop() for c in chains), dtype=bool, count=n)
+    spliced = np.fromiter((c.spliced for c in chains), dtype=bool, count=n)
+
+    # Empty chains have no endpoints; (-1, -1) never matches a border.
+    starts = np.array([c.start_pos if c.start_pos is not None else (-1, -1)
+                       for c in chains], dtype=np.int32)
+    ends = np.array([c.end_pos if c.end_pos is not None else (-1, -1)
+                     for c in chains], dtype=np.int32)
+
+    if HAVE_NUMBA and n >= _NUMBA_MIN_CHAINS:
+        # Single fused pass over the predicate arrays, no boolean temporaries
+        keep = _keep_mask_kernel(lengths, loops, spliced,
+                                 starts[:, 0], starts[:, 1],
+                                 ends[:, 0], ends[:, 1],
+                                 grid_height, grid_width, min_length)
+    else:
+        def border_mask(pos: np.ndarray) -> np.ndarray:
+            i, j = pos[:, 0], pos[:, 1]
+            return ((i == 0) | (i == grid_height - 1) |
+                    (j == 0) | (j == grid_width - 1))
+
+        keep = (lengths >= min_length) & (loops | spliced |
+                                          border_mask(starts) |
+                                          border_mask(ends))
+
+    return FilteredChains(chains[i] for i in np.nonzero(keep)[0])
 
 
 def _touches_border(
@@ -144,14 +197,21 @@ def get_chain_statistics(chains: List[Chain]) -> dict:
             'min_length': 0
         }
 
-    lengths = [len(c) for c in chains]
+    # Materialize the per-chain quantities once, then let the reductions
+    # run as C loops instead of Python branches per chain.
+    n = len(chains)
+    lengths = np.fromiter((len(c) for c in chains), dtype=np.int64, count=n)
+    loops = np.fromiter((c.is_loop() for c in chains), dtype=bool, count=n)
+    spliced = np.fromiter((c.spliced for c in chains), dtype=bool, count=n)
+
+    total_length = int(lengths.sum())
 
     return {
-        'num_chains': len(chains),
-        'num_loops': sum(1 for c in chains if c.is_loop()),
-        'num_spliced': sum(1 for c in chains if c.spliced),
-        'total_length': sum(lengths),
-        'avg_length': sum(lengths) / len(chains) if chains else 0,
-        'max_length': max(lengths) if lengths else 0,
-        'min_length': min(lengths) if lengths else 0
+        'num_chains': n,
+        'num_loops': int(loops.sum()),
+        'num_spliced': int(spliced.sum()),
+        'total_length': total_length,
+        'avg_length': total_length / n,
+        'max_length': int(lengths.max()),
+        'min_length': int(lengths.min())
     }
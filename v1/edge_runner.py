@@ -3,19 +3,447 @@ Stage 3: Recursive EdgeRunner
 Traces connected boundaries on the tile grid with branching and splicing support.
 """
 
+from concurrent.futures import ThreadPoolExecutor
 from typing import List, Tuple, Optional
-import copy
+
+import numpy as np
 
 try:
-    from .utils import (
-        CellGrid, Chain, get_direction, get_distance, compute_turn_code,
-        get_neighbors_8, DIRECTION_VECTORS
-    )
+    from .utils import CellGrid, Chain, DIRECTION_VECTORS
 except ImportError:
-    from utils import (
-        CellGrid, Chain, get_direction, get_distance, compute_turn_code,
-        get_neighbors_8, DIRECTION_VECTORS
-    )
+    from utils import CellGrid, Chain, DIRECTION_VECTORS
+
+try:
+    from numba import njit
+    HAVE_NUMBA = True
+except ImportError:
+    HAVE_NUMBA = False
+
+# Absolute turn angle per turn code:
+# 0=0°, 1=45°, 2=-45°, 3=90°, 4=-90°, 5=135°, 6=-135°, 7=180°
+_TURN_ANGLES = (0, 45, 45, 90, 90, 135, 135, 180)
+
+# LUT versions of utils.compute_turn_code / get_distance / DIRECTION_VECTORS
+# for the compiled tracer: indexed by (new_dir - cur_dir) % 8, turn code and
+# direction code respectively.
+_TURN_CODE_LUT = np.array([0, 1, 3, 5, 7, 6, 4, 2], dtype=np.int8)
+_TURN_ANGLE_LUT = np.array(_TURN_ANGLES, dtype=np.int16)
+_DIST_LUT = np.array([1.0, np.sqrt(2)] * 4, dtype=np.float64)
+_DI = np.array([d[0] for d in DIRECTION_VECTORS], dtype=np.int8)
+_DJ = np.array([d[1] for d in DIRECTION_VECTORS], dtype=np.int8)
+
+# Plain-Python twins of the LUTs above for the interpreted fallback tracer
+# (tuple indexing beats ndarray scalar extraction in the interpreter)
+_TURN_CODE_PY = (0, 1, 3, 5, 7, 6, 4, 2)
+_DIST_PY = (1.0, float(np.sqrt(2))) * 4
+
+# Below this many active tiles a thread pool costs more to spin up than
+# sequential tracing; small grids stay on the single-threaded path.
+_PARALLEL_MIN_CELLS = 4096
+
+# Fused 64-entry LUT: absolute turn angle for (current_dir, new_dir),
+# indexed as current_dir * 8 + new_dir. Replaces the per-candidate
+# compute_turn_code call + angle mapping in the direction choosers.
+_TURN_ANGLE_BY_DIRS = tuple(
+    _TURN_ANGLES[_TURN_CODE_LUT[(new_dir - cur_dir) % 8]]
+    for cur_dir in range(8) for new_dir in range(8)
+)
+
+
+if HAVE_NUMBA:
+    @njit(cache=True)
+    def _label_components(activation):
+        """
+        Two-pass 8-connectivity component labeling with union-find
+        (union by rank + path compression).
+
+        Returns an int32 (H, W) array holding each active cell's component
+        root, or -1 for inactive cells.
+        """
+        H, W = activation.shape
+        parent = np.arange(H * W, dtype=np.int32)
+        rank = np.zeros(H * W, dtype=np.int32)
+
+        def find(x):
+            root = x
+            while parent[root] != root:
+                root = parent[root]
+            # Path compression
+            while parent[x] != root:
+                nxt = parent[x]
+                parent[x] = root
+                x = nxt
+            return root
+
+        def union(a, b):
+            ra = find(a)
+            rb = find(b)
+            if ra == rb:
+                return
+            if rank[ra] < rank[rb]:
+                ra, rb = rb, ra
+            parent[rb] = ra
+            if rank[ra] == rank[rb]:
+                rank[ra] += 1
+
+        # Pass 1: union each active cell with its already-scanned neighbors
+        # (W, NW, N, NE in row-major order).
+        for i in range(H):
+            for j in range(W):
+                if activation[i, j] == 0:
+                    continue
+                idx = i * W + j
+                if j > 0 and activation[i, j - 1] == 1:
+                    union(idx, idx - 1)
+                if i > 0:
+                    if activation[i - 1, j] == 1:
+                        union(idx, idx - W)
+                    if j > 0 and activation[i - 1, j - 1] == 1:
+                        union(idx, idx - W - 1)
+                    if j < W - 1 and activation[i - 1, j + 1] == 1:
+                        union(idx, idx - W + 1)
+
+        # Pass 2: flatten to roots
+        labels = np.full((H, W), -1, dtype=np.int32)
+        for i in range(H):
+            for j in range(W):
+                if activation[i, j] == 1:
+                    labels[i, j] = find(i * W + j)
+        return labels
+
+
+if HAVE_NUMBA:
+    # Frame record layout for the compiled tracer (one row per frame):
+    # 0 chain_id, 1 pos_i, 2 pos_j, 3 dir, 4 branching, 5 n_branches,
+    # 6 next_branch, 7 resume_dir, 8 steps_prefix, 9 tiles_prefix,
+    # 10 results_count (chains finished under this frame so far)
+    @njit(cache=True, nogil=True)
+    def _trace_jit(activation, visited, chain_id_arr, index_arr,
+                   seed_i, seed_j, init_dir, root_chain_id):
+        """
+        Compiled equivalent of _edge_runner_iterative over SoA grid arrays.
+
+        Emits one chain per frame; frames are created in the final output
+        order (main chain first, then branches depth-first), so row k of the
+        per-frame outputs is chain k. Returns
+        (offsets, lengths, chain_ids, spliced, tiles_i, tiles_j, turns, dists)
+        where chain k's tiles are tiles_i/j[offsets[k]:offsets[k]+lengths[k]]
+        and its steps are turns/dists[offsets[k]:offsets[k]+lengths[k]-1].
+        """
+        H, W = activation.shape
+
+        # Shared step/tile buffers (rewound at branch points)
+        buf_ti = np.empty(64, np.int32)
+        buf_tj = np.empty(64, np.int32)
+        buf_turn = np.empty(64, np.int8)
+        buf_dist = np.empty(64, np.float64)
+        buf_ti[0] = seed_i
+        buf_tj[0] = seed_j
+        n_tiles = 1
+        n_steps = 0
+
+        visited[seed_i, seed_j] = 1
+        chain_id_arr[seed_i, seed_j] = root_chain_id
+        index_arr[seed_i, seed_j] = 0
+
+        # Frame storage; rows are allocated sequentially and never reused,
+        # so the row index doubles as the frame's creation/output order
+        fdata = np.zeros((16, 11), np.int64)
+        fbranch = np.empty((16, 8), np.int8)
+        stack = np.empty(16, np.int64)
+        depth = 0
+        n_frames = 1
+        cur = 0
+
+        fdata[0, 0] = root_chain_id
+        fdata[0, 1] = seed_i
+        fdata[0, 2] = seed_j
+        fdata[0, 3] = init_dir
+
+        # Per-frame chain outputs + flat tile/step arenas
+        out_off = np.empty(16, np.int64)
+        out_len = np.empty(16, np.int64)
+        out_cid = np.empty(16, np.int64)
+        out_spliced = np.empty(16, np.uint8)
+        out_ti = np.empty(256, np.int32)
+        out_tj = np.empty(256, np.int32)
+        out_turn = np.empty(256, np.int8)
+        out_dist = np.empty(256, np.float64)
+        total = 0
+
+        unvis = np.empty(8, np.int64)
+        vis = np.empty(8, np.int64)
+
+        while True:
+            if fdata[cur, 4] == 1:
+                # Branch dispatch: rewind shared buffers to the branch point
+                n_steps = fdata[cur, 8]
+                n_tiles = fdata[cur, 9]
+                pi = fdata[cur, 1]
+                pj = fdata[cur, 2]
+                cdir = fdata[cur, 3]
+
+                if fdata[cur, 6] < fdata[cur, 5]:
+                    # Next pending branch becomes a new frame
+                    bdir = fbranch[cur, fdata[cur, 6]]
+                    fdata[cur, 6] += 1
+                    step_dir = bdir
+                    new_cid = fdata[cur, 0] + fdata[cur, 10] + 1
+                    push_frame = True
+                else:
+                    # All branches traced: resume the main direction
+                    step_dir = fdata[cur, 7]
+                    new_cid = fdata[cur, 0]
+                    push_frame = False
+
+                ni = pi + _DI[step_dir]
+                nj = pj + _DJ[step_dir]
+
+                if n_tiles == buf_ti.size:
+                    buf_ti, buf_tj, buf_turn, buf_dist = _grow_bufs(
+                        buf_ti, buf_tj, buf_turn, buf_dist, n_tiles, n_steps)
+                buf_turn[n_steps] = _TURN_CODE_LUT[(step_dir - cdir) % 8]
+                buf_dist[n_steps] = _DIST_LUT[step_dir]
+                n_steps += 1
+                buf_ti[n_tiles] = ni
+                buf_tj[n_tiles] = nj
+                n_tiles += 1
+
+                visited[ni, nj] = 1
+                chain_id_arr[ni, nj] = new_cid
+                index_arr[ni, nj] = n_tiles - 1
+
+                if push_frame:
+                    if n_frames == fdata.shape[0]:
+                        (fdata, fbranch, stack, out_off, out_len,
+                         out_cid, out_spliced) = _grow_frames(
+                            fdata, fbranch, stack, out_off, out_len,
+                            out_cid, out_spliced, n_frames)
+                    stack[depth] = cur
+                    depth += 1
+                    row = n_frames
+                    n_frames += 1
+                    fdata[row, 0] = new_cid
+                    fdata[row, 1] = ni
+                    fdata[row, 2] = nj
+                    fdata[row, 3] = step_dir
+                    fdata[row, 4] = 0
+                    fdata[row, 10] = 0
+                    cur = row
+                else:
+                    fdata[cur, 1] = ni
+                    fdata[cur, 2] = nj
+                    fdata[cur, 3] = step_dir
+                    fdata[cur, 4] = 0
+                continue
+
+            # Trace step: enumerate active neighbors in direction-code order
+            pi = fdata[cur, 1]
+            pj = fdata[cur, 2]
+            cdir = fdata[cur, 3]
+            nu = 0
+            nv = 0
+            for d in range(8):
+                ni = pi + _DI[d]
+                nj = pj + _DJ[d]
+                if 0 <= ni < H and 0 <= nj < W and activation[ni, nj] == 1:
+                    if visited[ni, nj] == 0:
+                        unvis[nu] = d
+                        nu += 1
+                    else:
+                        vis[nv] = d
+                        nv += 1
+
+            if nu == 1:
+                # Single path: continue tracing
+                new_dir = unvis[0]
+                ni = pi + _DI[new_dir]
+                nj = pj + _DJ[new_dir]
+                if n_tiles == buf_ti.size:
+                    buf_ti, buf_tj, buf_turn, buf_dist = _grow_bufs(
+                        buf_ti, buf_tj, buf_turn, buf_dist, n_tiles, n_steps)
+                buf_turn[n_steps] = _TURN_CODE_LUT[(new_dir - cdir) % 8]
+                buf_dist[n_steps] = _DIST_LUT[new_dir]
+                n_steps += 1
+                buf_ti[n_tiles] = ni
+                buf_tj[n_tiles] = nj
+                n_tiles += 1
+
+                visited[ni, nj] = 1
+                chain_id_arr[ni, nj] = fdata[cur, 0]
+                index_arr[ni, nj] = n_tiles - 1
+
+                fdata[cur, 1] = ni
+                fdata[cur, 2] = nj
+                fdata[cur, 3] = new_dir
+                continue
+
+            if nu > 1:
+                # Branch point: remember the non-main branches and the main
+                # (minimal-turn) continuation, then dispatch depth-first
+                best = 0
+                best_angle = np.int16(32767)
+                for t in range(nu):
+                    angle = _TURN_ANGLE_LUT[_TURN_CODE_LUT[(unvis[t] - cdir) % 8]]
+                    if angle < best_angle:
+                        best_angle = angle
+                        best = t
+                nb = 0
+                for t in range(nu):
+                    if t != best:
+                        fbranch[cur, nb] = unvis[t]
+                        nb += 1
+                fdata[cur, 5] = nb
+                fdata[cur, 6] = 0
+                fdata[cur, 7] = unvis[best]
+                fdata[cur, 8] = n_steps
+                fdata[cur, 9] = n_tiles
+                fdata[cur, 4] = 1
+                continue
+
+            spliced = np.uint8(0)
+            if nv > 0:
+                # Splice into the minimal-turn visited neighbor
+                best = 0
+                best_angle = np.int16(32767)
+                for t in range(nv):
+                    angle = _TURN_ANGLE_LUT[_TURN_CODE_LUT[(vis[t] - cdir) % 8]]
+                    if angle < best_angle:
+                        best_angle = angle
+                        best = t
+                sdir = vis[best]
+                si = pi + _DI[sdir]
+                sj = pj + _DJ[sdir]
+                if n_tiles == buf_ti.size:
+                    buf_ti, buf_tj, buf_turn, buf_dist = _grow_bufs(
+                        buf_ti, buf_tj, buf_turn, buf_dist, n_tiles, n_steps)
+                buf_turn[n_steps] = _TURN_CODE_LUT[(sdir - cdir) % 8]
+                buf_dist[n_steps] = _DIST_LUT[sdir]
+                n_steps += 1
+                buf_ti[n_tiles] = si
+                buf_tj[n_tiles] = sj
+                n_tiles += 1
+
+                # A loop returns to the seed; loops are not marked spliced
+                is_loop = (n_tiles >= 3 and
+                           buf_ti[n_tiles - 1] == buf_ti[0] and
+                           buf_tj[n_tiles - 1] == buf_tj[0])
+                if not is_loop:
+                    spliced = np.uint8(1)
+
+            # Emit this frame's chain into the flat arenas
+            while total + n_tiles > out_ti.size:
+                out_ti, out_tj, out_turn, out_dist = _grow_bufs(
+                    out_ti, out_tj, out_turn, out_dist, total, total)
+            out_off[cur] = total
+            out_len[cur] = n_tiles
+            out_cid[cur] = fdata[cur, 0]
+            out_spliced[cur] = spliced
+            out_ti[total:total + n_tiles] = buf_ti[:n_tiles]
+            out_tj[total:total + n_tiles] = buf_tj[:n_tiles]
+            out_turn[total:total + n_steps] = buf_turn[:n_steps]
+            out_dist[total:total + n_steps] = buf_dist[:n_steps]
+            total += n_tiles
+
+            if depth == 0:
+                break
+
+            # Credit this frame's finished subtree to its parent and resume it
+            subtree = fdata[cur, 10] + 1
+            depth -= 1
+            cur = stack[depth]
+            fdata[cur, 10] += subtree
+
+        return (out_off[:n_frames], out_len[:n_frames], out_cid[:n_frames],
+                out_spliced[:n_frames], out_ti[:total], out_tj[:total],
+                out_turn[:total], out_dist[:total])
+
+    @njit(cache=True, nogil=True)
+    def _grow_bufs(ti, tj, turn, dist, n_tiles, n_steps):
+        """Double the shared tile/step buffers, preserving live contents."""
+        new_ti = np.empty(ti.size * 2, np.int32)
+        new_tj = np.empty(tj.size * 2, np.int32)
+        new_turn = np.empty(turn.size * 2, np.int8)
+        new_dist = np.empty(dist.size * 2, np.float64)
+        new_ti[:n_tiles] = ti[:n_tiles]
+        new_tj[:n_tiles] = tj[:n_tiles]
+        new_turn[:n_steps] = turn[:n_steps]
+        new_dist[:n_steps] = dist[:n_steps]
+        return new_ti, new_tj, new_turn, new_dist
+
+    @njit(cache=True, nogil=True)
+    def _grow_frames(fdata, fbranch, stack, out_off, out_len, out_cid,
+                     out_spliced, n_frames):
+        """Double the frame stack storage, preserving live frames."""
+        cap = fdata.shape[0] * 2
+        new_fdata = np.zeros((cap, fdata.shape[1]), np.int64)
+        new_fbranch = np.empty((cap, 8), np.int8)
+        new_stack = np.empty(cap, np.int64)
+        new_off = np.empty(cap, np.int64)
+        new_len = np.empty(cap, np.int64)
+        new_cid = np.empty(cap, np.int64)
+        new_spliced = np.empty(cap, np.uint8)
+        new_fdata[:n_frames] = fdata[:n_frames]
+        new_fbranch[:n_frames] = fbranch[:n_frames]
+        new_stack[:n_frames] = stack[:n_frames]
+        new_off[:n_frames] = out_off[:n_frames]
+        new_len[:n_frames] = out_len[:n_frames]
+        new_cid[:n_frames] = out_cid[:n_frames]
+        new_spliced[:n_frames] = out_spliced[:n_frames]
+        return (new_fdata, new_fbranch, new_stack, new_off, new_len,
+                new_cid, new_spliced)
+
+    def _numba_warmup():
+        """
+        Touch each kernel once at import so the compiled code (from the
+        on-disk cache after the first ever run) is loaded up front rather
+        than mid-pipeline on the first real grid. _trace_jit keeps a lazy
+        signature — spelling out its eight-array return type buys nothing —
+        so the warmup call is what pins its compilation.
+        """
+        act = np.zeros((2, 2), dtype=np.uint8)
+        act[0, 0] = 1
+        act[0, 1] = 1
+        # Match the real call: _label_components sees the read-only
+        # activation view, _trace_jit the writable grid arrays
+        ro = act.view()
+        ro.flags.writeable = False
+        _label_components(ro)
+        _trace_jit(act, np.zeros((2, 2), np.uint8),
+                   np.full((2, 2), -1, np.int32),
+                   np.full((2, 2), -1, np.int32), 0, 0, 2, 0)
+
+    _numba_warmup()
+
+
+def _edge_runner_numba(
+    seed: Tuple[int, int],
+    direction: int,
+    cells: CellGrid,
+    parent_chain_id: int
+) -> List[Chain]:
+    """Run the compiled tracer and wrap its arrays back into Chain objects."""
+    off, lengths, cids, spliced, ti, tj, turn, dist = _trace_jit(
+        cells._activation, cells._visited, cells._chain_id,
+        cells._index_in_chain, seed[0], seed[1], direction, parent_chain_id)
+
+    ti_l = ti.tolist()
+    tj_l = tj.tolist()
+    turn_l = turn.tolist()
+    dist_l = dist.tolist()
+
+    # Exact-size list up front: the chain count is known, so no append churn
+    chains: List[Optional[Chain]] = [None] * off.size
+    for k in range(off.size):
+        s = int(off[k])
+        e = s + int(lengths[k])
+        chains[k] = Chain(
+            steps=list(zip(turn_l[s:e - 1], dist_l[s:e - 1])),
+            tiles=list(zip(ti_l[s:e], tj_l[s:e])),
+            chain_id=int(cids[k]),
+            spliced=bool(spliced[k])
+        )
+    return chains
 
 
 def extract_chains_from_grid(cells: CellGrid) -> List[Chain]:
@@ -30,12 +458,26 @@ def extract_chains_from_grid(cells: CellGrid) -> List[Chain]:
     """
     chains = []
 
-    # Find all seed positions (activated, unvisited tiles)
-    seeds = []
-    for i in range(cells.height):
-        for j in range(cells.width):
-            if cells[i, j].activation == 1 and cells[i, j].visited == 0:
-                seeds.append((i, j))
+    # Find seed positions. With numba available, a union-find component
+    # labeling pass yields exactly one seed per connected component (its
+    # first cell in row-major order), skipping the per-cell Python scan.
+    # Fallback: scan every cell and let the visited flag skip duplicates.
+    if HAVE_NUMBA:
+        labels = _label_components(cells.get_activation_map())
+        flat = labels.ravel()
+        active_idx = np.nonzero(flat >= 0)[0]            # row-major order
+        _, first = np.unique(flat[active_idx], return_index=True)
+        seed_indices = np.sort(active_idx[first])
+        width = cells.width
+        seeds = [(int(k) // width, int(k) % width) for k in seed_indices]
+
+        # Components are disjoint, so on big grids the compiled (nogil)
+        # tracer can run one thread per component against the shared arrays
+        if len(seeds) > 1 and active_idx.size >= _PARALLEL_MIN_CELLS:
+            return _extract_chains_parallel(cells, seeds, labels)
+    else:
+        seeds = [(int(i), int(j)) for i, j in
+                 np.argwhere((cells._activation == 1) & (cells._visited == 0))]
 
     # Process each connected component
     for seed_pos in seeds:
@@ -51,12 +493,11 @@ def extract_chains_from_grid(cells: CellGrid) -> List[Chain]:
             continue
 
         # Start new chain from seed
-        new_chains = _edge_runner_recursive(
-            pos=seed_pos,
+        tracer = _edge_runner_numba if HAVE_NUMBA else _edge_runner_iterative
+        new_chains = tracer(
+            seed=seed_pos,
             direction=initial_dir,
             cells=cells,
-            chain_steps=[],
-            chain_tiles=[seed_pos],
             parent_chain_id=len(chains)
         )
 
@@ -66,228 +507,287 @@ def extract_chains_from_grid(cells: CellGrid) -> List[Chain]:
     return chains
 
 
+def _extract_chains_parallel(
+    cells: CellGrid,
+    seeds: List[Tuple[int, int]],
+    labels: np.ndarray
+) -> List[Chain]:
+    """
+    Trace connected components concurrently with a thread pool.
+
+    Components never share tiles, so each _trace_jit call (which releases
+    the GIL) can write the shared visited/chain_id/index arrays without
+    contention. Every component is traced with chain ids starting at 0 and
+    renumbered afterwards to the running total in seed order, so the output
+    (chains and grid marks) is bit-identical to the sequential path.
+    """
+    tasks = []
+    for seed_pos in seeds:
+        initial_dir = _find_initial_direction(seed_pos, cells)
+        if initial_dir is None:
+            # Isolated single tile, mark visited and skip
+            cells[seed_pos].visited = 1
+            continue
+        tasks.append((seed_pos, initial_dir))
+
+    if not tasks:
+        return []
+
+    with ThreadPoolExecutor() as pool:
+        per_component = list(pool.map(
+            lambda t: _edge_runner_numba(
+                seed=t[0], direction=t[1], cells=cells, parent_chain_id=0),
+            tasks))
+
+    # Renumber: component k's chains start where components 0..k-1 ended,
+    # exactly as the sequential parent_chain_id=len(chains) would assign
+    chains: List[Chain] = []
+    offset_by_root = np.zeros(cells.height * cells.width, dtype=np.int32)
+    offset = 0
+    for (seed_pos, _), component_chains in zip(tasks, per_component):
+        offset_by_root[labels[seed_pos]] = offset
+        for chain in component_chains:
+            chain.chain_id += offset
+        chains.extend(component_chains)
+        offset += len(component_chains)
+
+    # Same renumbering for the per-tile chain_id marks, one vectorized pass
+    # (isolated tiles keep chain_id == -1 and are excluded by the mask)
+    mask = (labels >= 0) & (cells._chain_id >= 0)
+    cells._chain_id[mask] += offset_by_root[labels[mask]]
+
+    return chains
+
+
 def _find_initial_direction(pos: Tuple[int, int], cells: CellGrid) -> Optional[int]:
     """
     Find initial direction from a seed position.
     Returns the direction to the first active neighbor found.
     """
-    neighbors = get_neighbors_8(pos, cells)
+    coords, valid = cells.neighbor_table()
+    act = cells._activation
 
-    for neighbor_pos in neighbors:
-        if cells[neighbor_pos].activation == 1:
-            return get_direction(pos, neighbor_pos)
+    nbrs = coords[pos]
+    ok = valid[pos]
+    for d in range(8):
+        if ok[d] and act[nbrs[d, 0], nbrs[d, 1]] == 1:
+            # Table rows are in DIRECTION_VECTORS order, so the row index
+            # is the direction code
+            return d
 
     return None
 
 
-def _edge_runner_recursive(
-    pos: Tuple[int, int],
+class _TraceFrame:
+    """
+    One in-flight tracer invocation, held on an explicit stack instead of
+    the C call stack. Chain prefixes live in buffers shared across frames
+    (each frame remembers truncation points), so branch points no longer
+    copy O(L) step/tile lists. Positions are flat int indices (i*W + j);
+    tuples are only materialized when the Chain is emitted.
+    """
+
+    __slots__ = ('chain_id', 'results', 'pos', 'dir', 'branching',
+                 'branches', 'next_branch', 'resume',
+                 'steps_prefix', 'tiles_prefix')
+
+    def __init__(self, chain_id: int, pos: int, direction: int):
+        self.chain_id = chain_id
+        self.results: List[Chain] = []   # chains from this frame's branches
+        self.pos = pos
+        self.dir = direction
+        self.branching = False           # currently dispatching branches?
+        self.branches: List[Tuple[int, int]] = []   # (flat_idx, dir) pairs
+        self.next_branch = 0
+        self.resume: Optional[Tuple[int, int]] = None
+        self.steps_prefix = 0
+        self.tiles_prefix = 0
+
+
+def _edge_runner_iterative(
+    seed: Tuple[int, int],
     direction: int,
     cells: CellGrid,
-    chain_steps: List[Tuple[int, float]],
-    chain_tiles: List[Tuple[int, int]],
     parent_chain_id: int
 ) -> List[Chain]:
     """
-    Recursively trace a boundary chain with branching and splicing.
+    Trace a boundary chain with branching and splicing.
+
+    Iterative depth-first rewrite of the original recursive tracer:
+    identical chains, ordering and chain_id assignment, but with an
+    explicit frame stack (no recursion limit), shared step/tile buffers
+    (no per-branch prefix copies), and flat int positions (no tuple
+    allocation per step — (i, j) pairs are built once at Chain emission).
 
     Args:
-        pos: Current position (i, j)
-        direction: Current direction (0-7)
+        seed: Seed position (i, j)
+        direction: Initial direction (0-7)
         cells: CellGrid being traced
-        chain_steps: Accumulated steps [(code, distance), ...]
-        chain_tiles: Accumulated tile positions [(i, j), ...]
-        parent_chain_id: ID to assign to main chain
+        parent_chain_id: ID to assign to the main chain
 
     Returns:
         List of Chain objects (main chain + any branches)
     """
-    # Mark current position as visited
-    cells[pos].visited = 1
-    cells[pos].chain_id = parent_chain_id
-    cells[pos].index_in_chain = len(chain_tiles) - 1
+    W = cells.width
+    seed_idx = seed[0] * W + seed[1]
+
+    steps_buf: List[Tuple[int, float]] = []
+    tiles_buf: List[int] = [seed_idx]
 
-    current_pos = pos
-    current_dir = direction
-    current_steps = list(chain_steps)
-    current_tiles = list(chain_tiles)
-    result_chains = []
+    # Flat views of the grid arrays, indexed by i*W + j
+    nbr = cells.flat_neighbor_table()
+    act = cells._activation.ravel()
+    vis = cells._visited.ravel()
+    cid = cells._chain_id.ravel()
+    idx_in = cells._index_in_chain.ravel()
+
+    vis[seed_idx] = 1
+    cid[seed_idx] = parent_chain_id
+    idx_in[seed_idx] = 0
+
+    frame = _TraceFrame(parent_chain_id, seed_idx, direction)
+    stack: List[_TraceFrame] = []
 
     while True:
-        # Get all active neighbors
-        all_neighbors = get_neighbors_8(current_pos, cells)
-        active_neighbors = [
-            nb for nb in all_neighbors
-            if cells[nb].activation == 1
-        ]
+        if frame.branching:
+            # Dispatch the next pending branch, depth-first
+            if frame.next_branch < len(frame.branches):
+                nb, nb_dir = frame.branches[frame.next_branch]
+                frame.next_branch += 1
+
+                # Rewind shared buffers to this frame's branch point
+                del steps_buf[frame.steps_prefix:]
+                del tiles_buf[frame.tiles_prefix:]
+
+                steps_buf.append((_TURN_CODE_PY[(nb_dir - frame.dir) % 8],
+                                  _DIST_PY[nb_dir]))
+                tiles_buf.append(nb)
+
+                branch_chain_id = frame.chain_id + len(frame.results) + 1
+                vis[nb] = 1
+                cid[nb] = branch_chain_id
+                idx_in[nb] = len(tiles_buf) - 1
+
+                stack.append(frame)
+                frame = _TraceFrame(branch_chain_id, nb, nb_dir)
+                continue
+
+            # All branches traced: resume the main direction
+            del steps_buf[frame.steps_prefix:]
+            del tiles_buf[frame.tiles_prefix:]
+
+            main_neighbor, main_dir = frame.resume
+            steps_buf.append((_TURN_CODE_PY[(main_dir - frame.dir) % 8],
+                              _DIST_PY[main_dir]))
+            tiles_buf.append(main_neighbor)
+
+            vis[main_neighbor] = 1
+            cid[main_neighbor] = frame.chain_id
+            idx_in[main_neighbor] = len(tiles_buf) - 1
+
+            frame.pos = main_neighbor
+            frame.dir = main_dir
+            frame.branching = False
+            continue
 
-        # Split into visited and unvisited
-        unvisited = [nb for nb in active_neighbors if cells[nb].visited == 0]
-        visited = [nb for nb in active_neighbors if cells[nb].visited == 1]
+        # Get all active neighbors as (flat_idx, dir) pairs, split into
+        # visited and unvisited, via the precomputed table (the table row
+        # index IS the direction code, so no get_direction calls either)
+        row = nbr[frame.pos]
+        unvisited = []
+        visited = []
+        for d in range(8):
+            q = row[d]
+            if q >= 0 and act[q] == 1:
+                if vis[q] == 0:
+                    unvisited.append((int(q), d))
+                else:
+                    visited.append((int(q), d))
 
         # CASE A: Unvisited neighbors exist
         if len(unvisited) >= 1:
             if len(unvisited) == 1:
                 # Single path: continue tracing
-                next_pos = unvisited[0]
-                new_dir = get_direction(current_pos, next_pos)
-                turn_code = compute_turn_code(current_dir, new_dir)
-                dist = get_distance(new_dir)
-
-                # Append step
-                current_steps.append((turn_code, dist))
-                current_tiles.append(next_pos)
-
-                # Mark as visited
-                cells[next_pos].visited = 1
-                cells[next_pos].chain_id = parent_chain_id
-                cells[next_pos].index_in_chain = len(current_tiles) - 1
-
-                # Update current state
-                current_pos = next_pos
-                current_dir = new_dir
-
-            else:
-                # Branch point: multiple unvisited neighbors
-                # Choose "main" direction (minimal turn from current direction)
-                main_neighbor, main_turn = _choose_main_direction(
-                    current_pos, current_dir, unvisited
-                )
-
-                # Create branches for other neighbors
-                for nb in unvisited:
-                    if nb == main_neighbor:
-                        continue
-
-                    # Compute step to this branch
-                    branch_dir = get_direction(current_pos, nb)
-                    branch_turn = compute_turn_code(current_dir, branch_dir)
-                    branch_dist = get_distance(branch_dir)
-
-                    # Create new branch chain
-                    branch_steps = current_steps + [(branch_turn, branch_dist)]
-                    branch_tiles = current_tiles + [nb]
-                    branch_chain_id = parent_chain_id + len(result_chains) + 1
-
-                    # Mark branch start
-                    cells[nb].visited = 1
-                    cells[nb].chain_id = branch_chain_id
-                    cells[nb].index_in_chain = len(branch_tiles) - 1
-
-                    # Recursively trace branch
-                    branch_chains = _edge_runner_recursive(
-                        pos=nb,
-                        direction=branch_dir,
-                        cells=cells,
-                        chain_steps=branch_steps,
-                        chain_tiles=branch_tiles,
-                        parent_chain_id=branch_chain_id
-                    )
-
-                    result_chains.extend(branch_chains)
-
-                # Continue with main direction
-                new_dir = get_direction(current_pos, main_neighbor)
-                turn_code = compute_turn_code(current_dir, new_dir)
-                dist = get_distance(new_dir)
-
-                current_steps.append((turn_code, dist))
-                current_tiles.append(main_neighbor)
-
-                cells[main_neighbor].visited = 1
-                cells[main_neighbor].chain_id = parent_chain_id
-                cells[main_neighbor].index_in_chain = len(current_tiles) - 1
-
-                current_pos = main_neighbor
-                current_dir = new_dir
-
-        # CASE B: No unvisited neighbors, but visited neighbors exist (splicing)
-        elif len(visited) > 0:
-            # Choose a visited neighbor to splice into
-            splice_neighbor = _choose_splice_target(current_pos, current_dir, visited)
-
-            # Compute step to splice point
-            splice_dir = get_direction(current_pos, splice_neighbor)
-            splice_turn = compute_turn_code(current_dir, splice_dir)
-            splice_dist = get_distance(splice_dir)
-
-            current_steps.append((splice_turn, splice_dist))
-            current_tiles.append(splice_neighbor)
-
-            # CRITICAL: Check if we've returned to the original seed (loop detection)
-            # A loop is when the last tile equals the first tile
-            is_loop = (len(current_tiles) >= 3 and
-                      current_tiles[-1] == current_tiles[0])
-
-            # Get the suffix of the chain we're splicing into
-            # Note: We don't actually splice in this implementation - we just mark
-            # that this chain ended at a visited tile
-            # The chain filtering stage will use this information
-
-            # Create final chain
-            chain = Chain(
-                steps=current_steps,
-                tiles=current_tiles,
-                chain_id=parent_chain_id,
-                spliced=(not is_loop)  # If it's a loop, don't mark as spliced
-            )
-            result_chains.insert(0, chain)  # Main chain goes first
-
-            return result_chains
-
-        # CASE C: Dead end (no neighbors at all, or only current position)
+                next_pos, new_dir = unvisited[0]
+
+                steps_buf.append((_TURN_CODE_PY[(new_dir - frame.dir) % 8],
+                                  _DIST_PY[new_dir]))
+                tiles_buf.append(next_pos)
+
+                vis[next_pos] = 1
+                cid[next_pos] = frame.chain_id
+                idx_in[next_pos] = len(tiles_buf) - 1
+
+                frame.pos = next_pos
+                frame.dir = new_dir
+                continue
+
+            # Branch point: trace the non-main neighbors first (depth-first,
+            # as the recursive version did), then resume with the main
+            # direction (minimal turn from current direction).
+            main = _min_turn_candidate(frame.dir, unvisited)
+            frame.branches = [c for c in unvisited if c is not main]
+            frame.next_branch = 0
+            frame.resume = main
+            frame.steps_prefix = len(steps_buf)
+            frame.tiles_prefix = len(tiles_buf)
+            frame.branching = True
+            continue
+
+        # CASE B: No unvisited neighbors, but visited neighbors exist
+        # (splicing); CASE C: dead end. Both emit this frame's main chain.
+        if len(visited) > 0:
+            # Splice into the minimal-turn visited neighbor
+            splice_neighbor, splice_dir = _min_turn_candidate(
+                frame.dir, visited)
+
+            steps_buf.append((_TURN_CODE_PY[(splice_dir - frame.dir) % 8],
+                              _DIST_PY[splice_dir]))
+            tiles_buf.append(splice_neighbor)
+
+            # CRITICAL: a loop is when the last tile returns to the seed;
+            # loops are not marked as spliced
+            is_loop = (len(tiles_buf) >= 3 and tiles_buf[-1] == tiles_buf[0])
+            spliced = not is_loop
         else:
-            # Create final chain
-            chain = Chain(
-                steps=current_steps,
-                tiles=current_tiles,
-                chain_id=parent_chain_id,
-                spliced=False
-            )
-            result_chains.insert(0, chain)  # Main chain goes first
+            spliced = False
+
+        # Emit main chain first, then this frame's branch chains; tile
+        # tuples are materialized exactly once, here
+        chain = Chain(
+            steps=list(steps_buf),
+            tiles=[(k // W, k % W) for k in tiles_buf],
+            chain_id=frame.chain_id,
+            spliced=spliced
+        )
+        result = [chain] + frame.results
 
-            return result_chains
+        if not stack:
+            return result
 
+        # Hand the finished frame's chains back to its parent
+        frame = stack.pop()
+        frame.results.extend(result)
 
-def _choose_main_direction(
-    pos: Tuple[int, int],
+
+def _min_turn_candidate(
     current_dir: int,
     candidates: List[Tuple[int, int]]
-) -> Tuple[Tuple[int, int], int]:
+) -> Tuple[int, int]:
     """
-    Choose the "main" direction from multiple candidates.
-    Selects the neighbor with minimal turn from current direction.
-
-    Returns:
-        (chosen_neighbor, turn_angle)
+    Choose the (flat_idx, dir) candidate with minimal turn from the
+    current direction. Used both for picking the "main" continuation at
+    branch points and for picking the splice target.
     """
-    min_turn = float('inf')
-    best_neighbor = candidates[0]
-
-    for nb in candidates:
-        new_dir = get_direction(pos, nb)
-        turn_code = compute_turn_code(current_dir, new_dir)
+    base = current_dir * 8
+    min_turn = 32767
+    best = candidates[0]
 
-        # Map turn codes to absolute angles for comparison
-        # 0=0°, 1=45°, 2=-45°, 3=90°, 4=-90°, 5=135°, 6=-135°, 7=180°
-        turn_angles = {0: 0, 1: 45, 2: 45, 3: 90, 4: 90, 5: 135, 6: 135, 7: 180}
-        abs_turn = turn_angles.get(turn_code, 0)
+    for cand in candidates:
+        abs_turn = _TURN_ANGLE_BY_DIRS[base + cand[1]]
 
         if abs_turn < min_turn:
             min_turn = abs_turn
-            best_neighbor = nb
-
-    return best_neighbor, min_turn
+            best = cand
 
-
-def _choose_splice_target(
-    pos: Tuple[int, int],
-    current_dir: int,
-    candidates: List[Tuple[int, int]]
-) -> Tuple[int, int]:
-    """
-    Choose which visited neighbor to splice into.
-    For now, just pick the one with minimal turn (same as main direction).
-    """
-    neighbor, _ = _choose_main_direction(pos, current_dir, candidates)
-    return neighbor
+    return best
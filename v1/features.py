@@ -4,7 +4,7 @@ Converts boundary chains into v_object vectors (shape histograms + color).
 """
 
 import numpy as np
-from typing import Tuple, List
+from typing import Tuple, List, Optional
 
 try:
     from .utils import Chain
@@ -15,7 +15,8 @@ except ImportError:
 def chain_to_v_object(
     chain: Chain,
     image: np.ndarray,
-    tile_size: int = 4
+    tile_size: int = 4,
+    tile_stats: Optional[Tuple[np.ndarray, np.ndarray]] = None
 ) -> Tuple[np.ndarray, Tuple[float, float]]:
     """
     Convert a chain to a v_object feature vector.
@@ -31,12 +32,28 @@ def chain_to_v_object(
         (v_object, centroid)
         - v_object: 13-dimensional feature vector
         - centroid: (x, y) in tile coordinates
+
+    tile_stats, if given, is a precomputed _precompute_tile_stats result
+    shared across chains of the same image.
     """
+    # Memoized per chain like _shape_cache, additionally keyed on the
+    # image identity and tile size; scene assembly scores the same chain
+    # against the same frame more than once. Frames are treated as
+    # immutable between calls, as elsewhere in the pipeline.
+    cached = chain._vobj_cache
+    if (cached is not None
+            and cached[0] == len(chain.steps)
+            and cached[1] == len(chain.tiles)
+            and cached[2] is image
+            and cached[3] == tile_size):
+        return cached[4]
+
     # 1. Shape features from direction codes
     shape_features = _compute_shape_features(chain)
 
     # 2. Color features via scanline fill
-    color_features = _compute_color_features(chain, image, tile_size)
+    color_features = _compute_color_features(chain, image, tile_size,
+                                             tile_stats)
 
     # 3. Combine into v_object
     v_object = np.concatenate([shape_features, color_features])
@@ -44,6 +61,8 @@ def chain_to_v_object(
     # 4. Compute centroid
     centroid = _compute_centroid(chain)
 
+    chain._vobj_cache = (len(chain.steps), len(chain.tiles), image,
+                         tile_size, (v_object, centroid))
     return v_object, centroid
 
 
@@ -54,16 +73,18 @@ def _compute_shape_features(chain: Chain) -> np.ndarray:
     Returns:
         10-dimensional array: [hist_0..hist_7, total_right, total_left]
     """
-    # Initialize histogram for 8 direction codes
-    hist = np.zeros(8, dtype=np.float64)
-
-    # Count each direction code
-    for code, dist in chain.steps:
-        hist[code] += 1
-
-    # Normalize by total number of steps
-    if len(chain.steps) > 0:
-        hist = hist / len(chain.steps)
+    # Memoized per chain (keyed by step count, like Chain.step_distances):
+    # scene assembly can score the same chain more than once
+    n = len(chain.steps)
+    cached = chain._shape_cache
+    if cached is not None and cached[0] == n:
+        return cached[1]
+    codes = np.fromiter((s[0] for s in chain.steps), dtype=np.intp, count=n)
+    # float32 throughout: the histogram ratios and turn totals don't need
+    # double precision, and the KNN bank stores float32 anyway
+    hist = np.bincount(codes, minlength=8).astype(np.float32)
+    if n > 0:
+        hist /= n
 
     # Compute turn statistics
     # Right turns: codes 1, 3, 5
@@ -74,7 +95,9 @@ def _compute_shape_features(chain: Chain) -> np.ndarray:
     total_left = hist[2] + hist[4] + hist[6] + 0.5 * hist[7]
 
     # Combine
-    features = np.concatenate([hist, [total_right, total_left]])
+    features = np.concatenate(
+        [hist, np.array([total_right, total_left], dtype=np.float32)])
+    chain._shape_cache = (n, features)
 
     return features
 
@@ -82,7 +105,8 @@ def _compute_shape_features(chain: Chain) -> np.ndarray:
 def _compute_color_features(
     chain: Chain,
     image: np.ndarray,
-    tile_size: int
+    tile_size: int,
+    tile_stats: Optional[Tuple[np.ndarray, np.ndarray]] = None
 ) -> np.ndarray:
     """
     Compute average RGB color inside the boundary via scanline fill.
@@ -90,75 +114,77 @@ def _compute_color_features(
     Returns:
         3-dimensional array: [R_mean, G_mean, B_mean]
     """
-    if not chain.tiles:
-        return np.array([0.0, 0.0, 0.0])
-
-    # Get boundary tiles as a set for fast lookup
-    boundary_tiles = set(chain.tiles)
-
-    # Determine bounding box
-    rows = [t[0] for t in chain.tiles]
-    cols = [t[1] for t in chain.tiles]
-    min_row = min(rows)
-    max_row = max(rows)
-    min_col = min(cols)
-    max_col = max(cols)
-
-    # Accumulate color values
-    sum_r = 0.0
-    sum_g = 0.0
-    sum_b = 0.0
-    count = 0
-
-    # Scanline fill: for each row, fill between leftmost and rightmost boundary
-    for i in range(min_row, max_row + 1):
-        # Find all boundary columns in this row
-        boundary_cols = sorted([tj for (ti, tj) in boundary_tiles if ti == i])
-
-        if len(boundary_cols) < 2:
-            # Not enough boundary points, skip or just sample boundary
-            for j in boundary_cols:
-                # Sample pixels in this boundary tile
-                y_start = i * tile_size
-                y_end = min(y_start + tile_size, image.shape[0])
-                x_start = j * tile_size
-                x_end = min(x_start + tile_size, image.shape[1])
-
-                tile_pixels = image[y_start:y_end, x_start:x_end]
-                if tile_pixels.size > 0:
-                    sum_r += np.sum(tile_pixels[:, :, 0])
-                    sum_g += np.sum(tile_pixels[:, :, 1])
-                    sum_b += np.sum(tile_pixels[:, :, 2])
-                    count += tile_pixels.shape[0] * tile_pixels.shape[1]
-            continue
-
-        # Fill between leftmost and rightmost
-        left_col = boundary_cols[0]
-        right_col = boundary_cols[-1]
-
-        # Convert tile coordinates to pixel coordinates
-        y_start = i * tile_size
-        y_end = min(y_start + tile_size, image.shape[0])
-        x_start = left_col * tile_size
-        x_end = min((right_col + 1) * tile_size, image.shape[1])
-
-        # Extract pixels in this span
-        if y_end > y_start and x_end > x_start:
-            span_pixels = image[y_start:y_end, x_start:x_end]
-            sum_r += np.sum(span_pixels[:, :, 0])
-            sum_g += np.sum(span_pixels[:, :, 1])
-            sum_b += np.sum(span_pixels[:, :, 2])
-            count += span_pixels.shape[0] * span_pixels.shape[1]
-
-    # Compute mean
-    if count > 0:
-        r_mean = sum_r / count
-        g_mean = sum_g / count
-        b_mean = sum_b / count
-    else:
-        r_mean = g_mean = b_mean = 0.0
-
-    return np.array([r_mean, g_mean, b_mean])
+    if len(chain.tiles) == 0:
+        return np.zeros(3, dtype=np.float32)
+
+    if tile_stats is None:
+        tile_stats = _precompute_tile_stats(image, tile_size)
+    tile_sums, col_prefix = tile_stats
+    tw = tile_sums.shape[1]
+
+    # Deduplicated boundary tiles, sorted by (row, col) — the array twin of
+    # the old sorted-set scanline bookkeeping
+    T = chain.tiles_array().astype(np.int64)
+    packed = np.unique(T[:, 0] * tw + T[:, 1])
+    rows = packed // tw
+    cols = packed % tw
+
+    # Group by row: each group is that row's sorted boundary columns
+    rows_u, starts, counts = np.unique(rows, return_index=True,
+                                       return_counts=True)
+
+    total = np.zeros(3, dtype=np.float64)
+    pixels = 0
+
+    # Rows with a single boundary tile: sample just that tile
+    single = counts == 1
+    if single.any():
+        total += tile_sums[rows_u[single], cols[starts[single]]].sum(axis=0)
+        pixels += int(single.sum()) * tile_size * tile_size
+
+    # Rows with two or more: fill the span between leftmost and rightmost
+    # boundary columns via the per-row column-prefix sums
+    multi = ~single
+    if multi.any():
+        rm = rows_u[multi]
+        left = cols[starts[multi]]
+        right = cols[starts[multi] + counts[multi] - 1]
+        total += (col_prefix[rm, right + 1] - col_prefix[rm, left]).sum(axis=0)
+        pixels += int((right - left + 1).sum()) * tile_size * tile_size
+
+    if pixels == 0:
+        return np.zeros(3, dtype=np.float32)
+
+    # Accumulate in float64 for exactness, hand back float32
+    return (total / pixels).astype(np.float32)
+
+
+def _precompute_tile_stats(
+    image: np.ndarray,
+    tile_size: int
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Per-tile RGB pixel sums for the whole image, plus their per-row prefix
+    sums along columns, so a scanline span [left, right] reduces to one
+    prefix-table subtraction instead of a pixel slice.
+
+    Returns:
+        (tile_sums, col_prefix) with shapes (tH, tW, 3) and (tH, tW+1, 3)
+    """
+    ts = tile_size
+    tile_H = image.shape[0] // ts
+    tile_W = image.shape[1] // ts
+
+    cropped = image[:tile_H * ts, :tile_W * ts]
+    tile_sums = (cropped
+                 .reshape(tile_H, ts, tile_W, ts, -1)
+                 .sum(axis=(1, 3), dtype=np.float64))
+
+    col_prefix = np.zeros((tile_H, tile_W + 1, tile_sums.shape[2]),
+                          dtype=np.float64)
+    np.cumsum(tile_sums, axis=1, out=col_prefix[:, 1:])
+
+    return tile_sums, col_prefix
 
 
 def _compute_centroid(chain: Chain) -> Tuple[float, float]:
@@ -168,15 +194,13 @@ def _compute_centroid(chain: Chain) -> Tuple[float, float]:
     Returns:
         (x, y) centroid in tile coordinates
     """
-    if not chain.tiles:
+    if len(chain.tiles) == 0:
         return (0.0, 0.0)
 
-    # Average all tile positions
-    rows = [t[0] for t in chain.tiles]
-    cols = [t[1] for t in chain.tiles]
-
-    centroid_i = np.mean(rows)
-    centroid_j = np.mean(cols)
+    # Average all tile positions in one pass over the cached tiles array
+    T = chain.tiles_array()
+    centroid_i = T[:, 0].mean()
+    centroid_j = T[:, 1].mean()
 
     # Return as (x, y) where x=j (column), y=i (row)
     return (centroid_j, centroid_i)
@@ -192,7 +216,7 @@ def compute_scale(chain: Chain) -> float:
     if not chain.steps:
         return 0.0
 
-    return sum(dist for code, dist in chain.steps)
+    return float(chain.step_distances().sum())
 
 
 def extract_objects_from_chains(
@@ -217,8 +241,13 @@ def extract_objects_from_chains(
     """
     objects = []
 
+    # Tile sums are a per-image quantity: compute them once here rather
+    # than re-reading the pixels for every chain
+    tile_stats = _precompute_tile_stats(image, tile_size) if chains else None
+
     for chain in chains:
-        v_object, centroid = chain_to_v_object(chain, image, tile_size)
+        v_object, centroid = chain_to_v_object(chain, image, tile_size,
+                                               tile_stats)
         scale = compute_scale(chain)
 
         obj = {
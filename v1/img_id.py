@@ -7,6 +7,17 @@ import numpy as np
 from typing import List, Dict, Tuple, Optional
 from dataclasses import dataclass, field
 
+try:
+    from scipy.optimize import linear_sum_assignment
+    from scipy.spatial import cKDTree
+    HAVE_SCIPY = True
+except ImportError:
+    HAVE_SCIPY = False
+
+# Scene banks below this size are scanned exhaustively; past it, a k-d tree
+# over coarse scene summaries prunes the candidates first.
+_KDTREE_MIN_SCENES = 512
+
 
 @dataclass
 class SceneObject:
@@ -42,6 +53,38 @@ class Scene:
     def __len__(self):
         return len(self.objects)
 
+    def _proto_arrays(self):
+        """
+        SoA view of the objects, grouped by proto_id, for vectorized scene
+        distance: (proto_ids, xy, scale, unique_protos, group_starts,
+        group_counts), all sorted by proto_id with insertion order preserved
+        within each group. Cached; rebuilt when objects are appended.
+        """
+        cached = getattr(self, '_soa_cache', None)
+        if cached is not None and cached[0] == len(self.objects):
+            return cached[1]
+
+        proto_ids = np.fromiter((o.proto_id for o in self.objects),
+                                dtype=np.int32, count=len(self.objects))
+        xy = np.array([(o.x, o.y) for o in self.objects],
+                      dtype=np.float64).reshape(-1, 2)
+        scale = np.fromiter((o.scale for o in self.objects),
+                            dtype=np.float64, count=len(self.objects))
+
+        # Stable sort keeps insertion order within each proto group, which
+        # the index-pair matching in _scene_distance relies on
+        order = np.argsort(proto_ids, kind='stable')
+        proto_ids = proto_ids[order]
+        xy = xy[order]
+        scale = scale[order]
+
+        unique_protos, starts, counts = np.unique(
+            proto_ids, return_index=True, return_counts=True)
+
+        arrays = (proto_ids, xy, scale, unique_protos, starts, counts)
+        self._soa_cache = (len(self.objects), arrays)
+        return arrays
+
 
 def create_scene_from_objects(
     object_list: List[dict],
@@ -61,23 +104,22 @@ def create_scene_from_objects(
     """
     scene = Scene()
 
-    for obj in object_list:
-        v_object = obj['v_object']
-        centroid = obj['centroid']  # (x, y) in tile coordinates
-        scale = obj['scale']
+    if not object_list:
+        return scene
 
-        # Get or assign proto_id
-        proto_id, is_new = obj_knn.get_or_add(v_object, similarity_threshold)
+    # Resolve every proto_id with one batched query instead of a KNN
+    # call per object
+    V = np.stack([obj['v_object'] for obj in object_list])
+    proto_ids, _ = obj_knn.get_or_add_batch(V, similarity_threshold)
 
-        # Create scene object
-        scene_obj = SceneObject(
-            proto_id=proto_id,
+    for obj, proto_id in zip(object_list, proto_ids):
+        centroid = obj['centroid']  # (x, y) in tile coordinates
+        scene.objects.append(SceneObject(
+            proto_id=int(proto_id),
             x=centroid[0],
             y=centroid[1],
-            scale=scale
-        )
-
-        scene.objects.append(scene_obj)
+            scale=obj['scale']
+        ))
 
     return scene
 
@@ -93,6 +135,11 @@ class ImgKNN:
         """Initialize scene memory."""
         self.scenes: List[Scene] = []
         self.next_scene_id = 0
+        self._by_id: Dict[int, int] = {}  # scene_id -> index into self.scenes
+        # Lazily (re)built k-d tree over scene summary vectors; None when
+        # stale. Only consulted past _KDTREE_MIN_SCENES.
+        self._tree = None
+        self._tree_dim = 0
 
     def add_scene(self, scene: Scene) -> int:
         """
@@ -108,9 +155,29 @@ class ImgKNN:
         self.next_scene_id += 1
 
         self.scenes.append(scene)
+        self._by_id[scene.scene_id] = len(self.scenes) - 1
+        self._tree = None
 
         return scene.scene_id
 
+    def _scene_summary(self, scene: Scene, dim: int) -> np.ndarray:
+        """
+        Fixed-dim coarse signature of a scene: proto counts scaled by the
+        count-mismatch penalty weight, plus mean position and scale. L2
+        between summaries tracks the dominant (count penalty) term of
+        _scene_distance, which makes it a usable screening metric.
+        """
+        v = np.zeros(dim + 3, dtype=np.float64)
+        if len(scene) == 0:
+            return v
+        proto_ids, xy, scale, _, _, _ = scene._proto_arrays()
+        in_range = proto_ids[proto_ids < dim]
+        v[:dim] = np.bincount(in_range, minlength=dim) * 10.0
+        v[dim] = xy[:, 0].mean()
+        v[dim + 1] = xy[:, 1].mean()
+        v[dim + 2] = scale.mean()
+        return v
+
     def query(
         self,
         query_scene: Scene,
@@ -127,24 +194,55 @@ class ImgKNN:
 
         Returns:
             List of (scene_id, distance) tuples
+
+        Past _KDTREE_MIN_SCENES stored scenes, a k-d tree over coarse scene
+        summaries screens the bank down to a generous candidate set and
+        only those run the exact _scene_distance; the screen is a
+        heuristic, so an outlying scene can in principle be pruned.
         """
         if len(self.scenes) == 0:
             return []
 
-        # Compute distances to all scenes
-        distances = []
-        for scene in self.scenes:
-            dist = self._scene_distance(query_scene, scene)
-            distances.append((scene.scene_id, dist))
-
-        # Sort by distance
-        distances.sort(key=lambda x: x[1])
+        n = len(self.scenes)
+
+        # Candidate screen for large banks
+        rows = None
+        if HAVE_SCIPY and n >= _KDTREE_MIN_SCENES:
+            if self._tree is None:
+                self._tree_dim = 1 + max(
+                    (o.proto_id for s in self.scenes for o in s.objects),
+                    default=0)
+                pts = np.stack([self._scene_summary(s, self._tree_dim)
+                                for s in self.scenes])
+                self._tree = cKDTree(pts)
+            m = min(n, max(32, 4 * k))
+            _, idx = self._tree.query(
+                self._scene_summary(query_scene, self._tree_dim), k=m)
+            # Ascending indices keep tie resolution by insertion order
+            rows = np.sort(np.atleast_1d(idx))
+
+        if rows is None:
+            rows = np.arange(n)
+
+        # Exact distances on the (surviving) scenes
+        d = np.fromiter((self._scene_distance(query_scene, self.scenes[i])
+                         for i in rows),
+                        dtype=np.float64, count=rows.size)
 
         # Filter by threshold
         if distance_threshold is not None:
-            distances = [(sid, d) for sid, d in distances if d <= distance_threshold]
+            candidates = np.nonzero(d <= distance_threshold)[0]
+        else:
+            candidates = np.arange(d.size)
+
+        # Top-k via argpartition (O(N) vs O(N log N) full sort); candidate
+        # indices stay ascending so ties resolve by insertion order
+        if k < candidates.size:
+            candidates = np.sort(candidates[np.argpartition(d[candidates], k)[:k]])
+        order = np.argsort(d[candidates], kind='stable')
 
-        return distances[:k]
+        return [(self.scenes[rows[i]].scene_id, float(d[i]))
+                for i in candidates[order]]
 
     def _scene_distance(self, scene1: Scene, scene2: Scene) -> float:
         """
@@ -166,50 +264,57 @@ class ImgKNN:
         if len(scene1) == 0 and len(scene2) == 0:
             return 0.0
 
-        # Build proto_id to objects mapping for both scenes
-        objs1_by_proto = {}
-        for obj in scene1.objects:
-            if obj.proto_id not in objs1_by_proto:
-                objs1_by_proto[obj.proto_id] = []
-            objs1_by_proto[obj.proto_id].append(obj)
-
-        objs2_by_proto = {}
-        for obj in scene2.objects:
-            if obj.proto_id not in objs2_by_proto:
-                objs2_by_proto[obj.proto_id] = []
-            objs2_by_proto[obj.proto_id].append(obj)
-
-        # Compute symmetric difference
-        all_protos = set(objs1_by_proto.keys()) | set(objs2_by_proto.keys())
-
-        total_distance = 0.0
-        matched_count = 0
-
-        for proto_id in all_protos:
-            objs1 = objs1_by_proto.get(proto_id, [])
-            objs2 = objs2_by_proto.get(proto_id, [])
-
-            count_diff = abs(len(objs1) - len(objs2))
-            total_distance += count_diff * 10.0  # Penalty for count mismatch
-
-            # Match objects greedily by position
-            min_count = min(len(objs1), len(objs2))
-            for i in range(min_count):
-                # Simple matching: pair by index (could be improved with Hungarian algorithm)
-                obj1 = objs1[i]
-                obj2 = objs2[i]
-
-                # Position distance
-                pos_dist = np.sqrt((obj1.x - obj2.x)**2 + (obj1.y - obj2.y)**2)
-                total_distance += pos_dist
-
-                # Scale distance (normalized)
-                scale_dist = abs(obj1.scale - obj2.scale) / max(obj1.scale, obj2.scale, 1.0)
-                total_distance += scale_dist
-
-                matched_count += 1
-
-        return total_distance
+        _, xy1, s1, protos1, starts1, counts1 = scene1._proto_arrays()
+        _, xy2, s2, protos2, starts2, counts2 = scene2._proto_arrays()
+
+        # Protos present in both scenes, with positions into each unique list
+        common, c1_idx, c2_idx = np.intersect1d(
+            protos1, protos2, assume_unique=True, return_indices=True)
+
+        # Count-mismatch penalty over the symmetric union: protos unique to
+        # one scene contribute their full count, common protos the difference
+        common1 = counts1[c1_idx]
+        common2 = counts2[c2_idx]
+        count_diff = (counts1.sum() - common1.sum() +
+                      counts2.sum() - common2.sum() +
+                      np.abs(common1 - common2).sum())
+        total_distance = float(count_diff) * 10.0
+
+        if common.size == 0:
+            return total_distance
+
+        if HAVE_SCIPY:
+            # Optimal (Hungarian) matching within each common proto group,
+            # so the distance no longer depends on object insertion order.
+            # Groups are tiny (a handful of objects), so O(n³) is negligible.
+            for g in range(common.size):
+                sl1 = slice(starts1[c1_idx[g]], starts1[c1_idx[g]] + common1[g])
+                sl2 = slice(starts2[c2_idx[g]], starts2[c2_idx[g]] + common2[g])
+                dxy = xy1[sl1][:, None, :] - xy2[sl2][None, :, :]
+                a = s1[sl1][:, None]
+                b = s2[sl2][None, :]
+                cost = (np.sqrt((dxy * dxy).sum(axis=2)) +
+                        np.abs(a - b) / np.maximum(np.maximum(a, b), 1.0))
+                rows, cols = linear_sum_assignment(cost)
+                total_distance += cost[rows, cols].sum()
+        else:
+            # Fallback: match objects by index within each common proto
+            # group, gathering the first min(count1, count2) of each
+            matched = np.minimum(common1, common2)
+            within = np.arange(matched.sum()) - np.repeat(
+                np.cumsum(matched) - matched, matched)
+            idx1 = np.repeat(starts1[c1_idx], matched) + within
+            idx2 = np.repeat(starts2[c2_idx], matched) + within
+
+            diff = xy1[idx1] - xy2[idx2]
+            total_distance += np.sqrt((diff * diff).sum(axis=1)).sum()
+
+            a = s1[idx1]
+            b = s2[idx2]
+            total_distance += (np.abs(a - b) /
+                               np.maximum(np.maximum(a, b), 1.0)).sum()
+
+        return float(total_distance)
 
     def get_scene(self, scene_id: int) -> Optional[Scene]:
         """
@@ -221,10 +326,8 @@ class ImgKNN:
         Returns:
             Scene object or None
         """
-        for scene in self.scenes:
-            if scene.scene_id == scene_id:
-                return scene
-        return None
+        i = self._by_id.get(scene_id)
+        return self.scenes[i] if i is not None else None
 
     def size(self) -> int:
         """Return number of scenes in memory."""
@@ -233,4 +336,7 @@ class ImgKNN:
     def clear(self):
         """Clear all scenes from memory."""
         self.scenes.clear()
+        self._by_id.clear()
+        self._tree = None
+        self._tree_dim = 0
         self.next_scene_id = 0
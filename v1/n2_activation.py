@@ -12,6 +12,22 @@ except ImportError:
     from utils import CellGrid
     from tile_neuron import TileNeuron
 
+# Loaded neurons keyed by (weights_path, tile_size): the weights file is
+# parsed once and every later call with the same arguments reuses the
+# neuron, instead of re-reading the JSON per frame. predict_labels never
+# mutates the neuron, so sharing is safe.
+_NEURON_CACHE = {}
+
+
+def _load_neuron(weights_path: str, tile_size: int) -> TileNeuron:
+    key = (weights_path, tile_size)
+    neuron = _NEURON_CACHE.get(key)
+    if neuron is None:
+        neuron = TileNeuron(tile_size=tile_size)
+        neuron.load_weights(weights_path)
+        _NEURON_CACHE[key] = neuron
+    return neuron
+
 
 def compute_activation_grid(
     image: np.ndarray,
@@ -35,38 +51,67 @@ def compute_activation_grid(
     tile_H = H // tile_size
     tile_W = W // tile_size
 
-    # Load trained neuron weights
-    neuron = TileNeuron(tile_size=tile_size)
-    neuron.load_weights(weights_path)
+    # Load trained neuron weights (cached after the first call)
+    neuron = _load_neuron(weights_path, tile_size)
 
-    # Initialize cell grid
+    # Initialize cell grid (cells start unvisited with chain_id = -1)
     grid = CellGrid(tile_H, tile_W)
 
-    # Ensure image is float32 in [0, 255] range
-    if image.dtype == np.uint8:
-        image = image.astype(np.float32)
+    # Extract every tile at once: crop to whole tiles, then reshape/transpose
+    # into an (N, tile_size, tile_size, 3) batch — no per-tile Python slicing.
+    cropped = image[:tile_H * tile_size, :tile_W * tile_size, :]
+    tiles = (cropped
+             .reshape(tile_H, tile_size, tile_W, tile_size, 3)
+             .transpose(0, 2, 1, 3, 4)
+             .reshape(-1, tile_size, tile_size, 3))
 
-    # Process each tile
-    for i in range(tile_H):
-        for j in range(tile_W):
-            # Extract tile pixels
-            y_start = i * tile_size
-            y_end = y_start + tile_size
-            x_start = j * tile_size
-            x_end = x_start + tile_size
+    # One batched GEMV instead of tile_H * tile_W predict_label calls
+    activations = neuron.predict_labels(tiles)
+    grid.set_activation_map(activations.reshape(tile_H, tile_W))
 
-            tile = image[y_start:y_end, x_start:x_end, :]
+    return grid
 
-            # Compute activation using trained neuron
-            activation = neuron.predict_label(tile)
 
-            # Initialize cell
-            grid.cells[i][j].activation = activation
-            grid.cells[i][j].visited = 0
-            grid.cells[i][j].chain_id = -1
-            grid.cells[i][j].index_in_chain = -1
+def compute_activation_grid_batch(
+    images: np.ndarray,
+    weights_path: str = "n2_tile_weights.json",
+    tile_size: int = 4
+) -> list:
+    """
+    Compute activation grids for a batch of same-shaped images at once.
 
-    return grid
+    All tiles from all images go through a single predict_labels GEMM,
+    amortizing the Python dispatch and the weight load across the batch.
+
+    Args:
+        images: RGB images as numpy array of shape (B, H, W, 3)
+        weights_path: Path to JSON file containing neuron weights
+        tile_size: Size of each tile (default 4x4 pixels)
+
+    Returns:
+        List of B CellGrids with activation values set (0 or 1)
+    """
+    images = np.asarray(images)
+    B, H, W = images.shape[:3]
+    tile_H = H // tile_size
+    tile_W = W // tile_size
+
+    neuron = _load_neuron(weights_path, tile_size)
+
+    cropped = images[:, :tile_H * tile_size, :tile_W * tile_size, :]
+    tiles = (cropped
+             .reshape(B, tile_H, tile_size, tile_W, tile_size, 3)
+             .transpose(0, 1, 3, 2, 4, 5)
+             .reshape(-1, tile_size, tile_size, 3))
+
+    activations = neuron.predict_labels(tiles).reshape(B, tile_H, tile_W)
+
+    grids = []
+    for amap in activations:
+        grid = CellGrid(tile_H, tile_W)
+        grid.set_activation_map(amap)
+        grids.append(grid)
+    return grids
 
 
 def visualize_activation(grid: CellGrid, tile_size: int = 4) -> np.ndarray:
@@ -80,17 +125,8 @@ def visualize_activation(grid: CellGrid, tile_size: int = 4) -> np.ndarray:
     Returns:
         Image array with activation visualization (0 or 255)
     """
-    H_pixels = grid.height * tile_size
-    W_pixels = grid.width * tile_size
-    vis = np.zeros((H_pixels, W_pixels), dtype=np.uint8)
-
-    for i in range(grid.height):
-        for j in range(grid.width):
-            if grid.cells[i][j].activation == 1:
-                y_start = i * tile_size
-                y_end = y_start + tile_size
-                x_start = j * tile_size
-                x_end = x_start + tile_size
-                vis[y_start:y_end, x_start:x_end] = 255
+    # Block-upscale the activation map in C instead of looping per tile
+    vis = grid.get_activation_map().astype(np.uint8) * 255
+    vis = np.repeat(np.repeat(vis, tile_size, axis=0), tile_size, axis=1)
 
     return vis
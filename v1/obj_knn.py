@@ -6,6 +6,20 @@ Simple KNN memory for object prototypes with weighted distance metric.
 import numpy as np
 from typing import List, Tuple, Optional
 
+try:
+    import faiss
+    HAVE_FAISS = True
+except ImportError:
+    HAVE_FAISS = False
+
+# Below this many prototypes the single-broadcast NumPy scan is already
+# fast enough that index-search overhead isn't worth it.
+_FAISS_MIN_PROTOTYPES = 256
+
+# Bank size at which the NumPy scan switches to the int8 pre-filter
+# (8x less memory traffic per row than the float64 matrix).
+_QUANT_MIN_PROTOTYPES = 1024
+
 
 class ObjKNN:
     """
@@ -26,9 +40,27 @@ class ObjKNN:
         self.shape_weight = shape_weight
         self.color_weight = color_weight
 
-        # Storage
-        self.prototypes: List[np.ndarray] = []  # List of v_object vectors
-        self.proto_ids: List[int] = []          # Corresponding proto_id for each
+        # Storage: one contiguous (capacity, dim) matrix grown by doubling,
+        # so a query is a single broadcast op instead of N small ones.
+        # float32: the feature ranges (histogram fractions, turn stats,
+        # 0-255 color) fit comfortably, and halving the bytes per row
+        # halves the memory traffic of the distance scan.
+        self._P = np.empty((0, 0), dtype=np.float32)
+        self._n = 0
+        self.proto_ids: List[int] = []          # Corresponding proto_id for each row
+        self._row_by_id = {}                    # proto_id -> row index into _P
+
+        # int8 mirror of the pre-weighted rows, quantized with one global
+        # scale (grown and requantized on overflow, which is rare). Large
+        # banks scan this first and rerank the survivors exactly against
+        # _P, so results never change — only bytes touched per row do.
+        self._Q = np.empty((0, 0), dtype=np.int8)
+        self._qscale = 0.0
+
+        # Optional faiss index over pre-weighted vectors: L2 on
+        # [shape * w_s, color * w_c] equals _weighted_distance exactly,
+        # so large banks can search in C++ instead of scanning _P
+        self._index = None
 
         # Counter for assigning new proto_ids
         self.next_proto_id = 0
@@ -48,11 +80,139 @@ class ObjKNN:
             proto_id = self.next_proto_id
             self.next_proto_id += 1
 
-        self.prototypes.append(v_object.copy())
+        # Grow the prototype matrix by doubling to amortize reallocation
+        if self._P.shape[1] == 0:
+            self._P = np.empty((8, v_object.size), dtype=np.float32)
+        elif self._n == self._P.shape[0]:
+            grown = np.empty((self._P.shape[0] * 2, self._P.shape[1]),
+                             dtype=np.float32)
+            grown[:self._n] = self._P[:self._n]
+            self._P = grown
+
+        self._P[self._n] = v_object
+        self._n += 1
         self.proto_ids.append(proto_id)
+        self._quantize_row(self._n - 1)
+        # First row wins for duplicate ids, matching the old linear scan
+        self._row_by_id.setdefault(proto_id, self._n - 1)
+
+        if HAVE_FAISS:
+            if self._index is None:
+                # Flat (exact) index: brute force, but vectorized in C++
+                self._index = faiss.IndexFlatL2(v_object.size)
+            self._index.add(self._weighted(v_object)[None].astype(np.float32))
 
         return proto_id
 
+    def add_objects(self, v_objects: np.ndarray) -> List[int]:
+        """
+        Add a batch of objects in one shot, auto-assigning proto_ids.
+
+        The whole matrix lands in _P with one contiguous copy (and at most
+        one reallocation) instead of one append per row, and the int8
+        mirror and faiss index are each updated with a single call.
+
+        Args:
+            v_objects: (N, dim) array of feature vectors
+
+        Returns:
+            List of assigned proto_ids, one per row
+        """
+        V = np.asarray(v_objects, dtype=np.float32)
+        if V.ndim == 1:
+            V = V[None, :]
+        n_new = V.shape[0]
+        if n_new == 0:
+            return []
+
+        # Grow once to cover the whole batch
+        if self._P.shape[1] == 0:
+            cap = 8
+            while cap < n_new:
+                cap *= 2
+            self._P = np.empty((cap, V.shape[1]), dtype=np.float32)
+        elif self._n + n_new > self._P.shape[0]:
+            cap = self._P.shape[0]
+            while cap < self._n + n_new:
+                cap *= 2
+            grown = np.empty((cap, self._P.shape[1]), dtype=np.float32)
+            grown[:self._n] = self._P[:self._n]
+            self._P = grown
+
+        start = self._n
+        self._P[start:start + n_new] = V
+        self._n += n_new
+
+        ids = list(range(self.next_proto_id, self.next_proto_id + n_new))
+        self.next_proto_id += n_new
+        self.proto_ids.extend(ids)
+        for row, proto_id in enumerate(ids, start):
+            self._row_by_id.setdefault(proto_id, row)
+
+        # Mirror the new rows into _Q in one pass, ratcheting the scale
+        # at most once for the whole batch
+        if self._Q.shape[0] < self._P.shape[0]:
+            grown_q = np.zeros((self._P.shape[0], self._P.shape[1]),
+                               dtype=np.int8)
+            if start > 0:
+                grown_q[:start] = self._Q[:start]
+            self._Q = grown_q
+        W = V.copy()
+        W[:, :10] *= self.shape_weight
+        W[:, 10:] *= self.color_weight
+        m = float(np.abs(W).max())
+        if m > self._qscale * 127.0:
+            self._qscale = m / 127.0
+            Wp = self._P[:start].copy()
+            Wp[:, :10] *= self.shape_weight
+            Wp[:, 10:] *= self.color_weight
+            self._Q[:start] = np.clip(
+                np.rint(Wp / self._qscale), -127, 127).astype(np.int8)
+        if self._qscale > 0.0:
+            self._Q[start:self._n] = np.clip(
+                np.rint(W / self._qscale), -127, 127).astype(np.int8)
+
+        if HAVE_FAISS:
+            if self._index is None:
+                self._index = faiss.IndexFlatL2(V.shape[1])
+            self._index.add(W.astype(np.float32))
+
+        return ids
+
+    def _quantize_row(self, row: int):
+        """
+        Append row's pre-weighted vector to the int8 mirror, growing the
+        global scale (and requantizing existing rows) when it overflows.
+        """
+        if self._Q.shape[0] < self._P.shape[0]:
+            grown = np.zeros((self._P.shape[0], self._P.shape[1]),
+                             dtype=np.int8)
+            if row > 0:
+                grown[:row] = self._Q[:row]
+            self._Q = grown
+
+        w = self._weighted(self._P[row])
+        m = float(np.abs(w).max())
+        if m > self._qscale * 127.0:
+            self._qscale = m / 127.0
+            # Requantize everything at the new scale; amortized cost is
+            # negligible since the scale only ratchets upward
+            W = self._P[:row].copy()
+            W[:, :10] *= self.shape_weight
+            W[:, 10:] *= self.color_weight
+            self._Q[:row] = np.clip(
+                np.rint(W / self._qscale), -127, 127).astype(np.int8)
+        if self._qscale > 0.0:
+            self._Q[row] = np.clip(
+                np.rint(w / self._qscale), -127, 127).astype(np.int8)
+
+    def _weighted(self, v_object: np.ndarray) -> np.ndarray:
+        """Pre-weight a vector so plain L2 equals _weighted_distance."""
+        w = np.asarray(v_object, dtype=np.float32).copy()
+        w[:10] *= self.shape_weight
+        w[10:] *= self.color_weight
+        return w
+
     def query(
         self,
         v_object: np.ndarray,
@@ -70,24 +230,138 @@ class ObjKNN:
         Returns:
             List of (proto_id, distance) tuples, sorted by distance
         """
-        if len(self.prototypes) == 0:
+        if self._n == 0:
             return []
+        v_object = np.asarray(v_object, dtype=np.float32)
+
+        # Large banks: search the faiss index instead of scanning _P
+        if HAVE_FAISS and self._index is not None and self._n >= _FAISS_MIN_PROTOTYPES:
+            q = self._weighted(v_object)[None].astype(np.float32)
+            sq_dists, rows = self._index.search(q, min(k, self._n))
+            results = []
+            for sq, row in zip(sq_dists[0], rows[0]):
+                if row < 0:
+                    continue
+                dist = float(np.sqrt(sq))
+                if distance_threshold is not None and dist > distance_threshold:
+                    continue
+                results.append((self.proto_ids[row], dist))
+            return results
+
+        # Large banks: coarse int8 scan first. Quantization error is bounded
+        # (scale/2 per dim per side), so rows provably outside the answer
+        # set can be discarded before touching the float64 matrix; the
+        # survivors are reranked exactly below, keeping results identical.
+        rows = None
+        if self._n >= _QUANT_MIN_PROTOTYPES and self._qscale > 0.0:
+            wq = self._weighted(v_object)
+            qq = np.clip(np.rint(wq / self._qscale), -127, 127)
+            diff_q = self._Q[:self._n].astype(np.int16) - qq.astype(np.int16)
+            d_approx = (np.sqrt(np.einsum('ij,ij->i', diff_q, diff_q,
+                                          dtype=np.int32).astype(np.float64))
+                        * self._qscale)
+            # |d_exact - d_approx| <= row error bound + exact query error
+            bound = (0.5 * self._qscale * np.sqrt(self._P.shape[1]) +
+                     float(np.linalg.norm(wq - qq * self._qscale)))
+            limit = np.inf
+            if distance_threshold is not None:
+                limit = distance_threshold + bound
+            if k < self._n:
+                kth = np.partition(d_approx, k - 1)[k - 1]
+                limit = min(limit, kth + 2.0 * bound)
+            rows = np.nonzero(d_approx <= limit)[0]
+
+        if rows is None:
+            rows = np.arange(self._n)
+
+        # One broadcast pass over the (surviving) prototype rows. Work in
+        # squared distances throughout — sqrt is monotone, so thresholding
+        # and ranking are unchanged — and take one sqrt over the k survivors
+        # instead of one per prototype.
+        diff = self._P[rows] - v_object[None, :]
+        ds = diff[:, :10]
+        dc = diff[:, 10:]
+        d_sq = (self.shape_weight ** 2 * np.einsum('ij,ij->i', ds, ds) +
+                self.color_weight ** 2 * np.einsum('ij,ij->i', dc, dc))
+
+        # Filter by threshold if provided (compared in squared units)
+        if distance_threshold is not None:
+            candidates = np.nonzero(
+                d_sq <= distance_threshold * distance_threshold)[0]
+        else:
+            candidates = np.arange(d_sq.size)
+
+        # Top-k via argpartition (O(N) vs O(N log N) full sort), then order
+        # the survivors; candidate indices stay ascending so ties resolve by
+        # insertion order like the original stable sort
+        if k < candidates.size:
+            candidates = np.sort(
+                candidates[np.argpartition(d_sq[candidates], k)[:k]])
+        order = np.argsort(d_sq[candidates], kind='stable')
+        top = candidates[order]
+
+        d_top = np.sqrt(d_sq[top])
+        return [(self.proto_ids[rows[i]], float(dist))
+                for i, dist in zip(top, d_top)]
+
+    def query_batch(
+        self,
+        v_objects: np.ndarray,
+        k: int = 1,
+        distance_threshold: Optional[float] = None
+    ) -> List[List[Tuple[int, float]]]:
+        """
+        Query nearest neighbors for a whole batch of vectors at once.
 
-        # Compute distances to all prototypes
-        distances = []
-        for i, prototype in enumerate(self.prototypes):
-            dist = self._weighted_distance(v_object, prototype)
-            distances.append((self.proto_ids[i], dist))
-
-        # Sort by distance
-        distances.sort(key=lambda x: x[1])
+        All pairwise distances come from a single GEMM on the pre-weighted
+        matrices (||p||² + ||q||² − 2·P·Qᵀ) instead of one scan per query;
+        per-query selection then follows the same rules as query().
 
-        # Filter by threshold if provided
-        if distance_threshold is not None:
-            distances = [(pid, d) for pid, d in distances if d <= distance_threshold]
+        Args:
+            v_objects: (M, 13) array of query vectors (a single vector works)
+            k: Number of nearest neighbors per query
+            distance_threshold: Optional threshold applied per query
 
-        # Return top k
-        return distances[:k]
+        Returns:
+            List of M result lists, each shaped like query()'s return value
+        """
+        Q = np.asarray(v_objects, dtype=np.float32)
+        if Q.ndim == 1:
+            Q = Q[None, :]
+        if self._n == 0:
+            return [[] for _ in range(Q.shape[0])]
+
+        P = self._P[:self._n].copy()
+        P[:, :10] *= self.shape_weight
+        P[:, 10:] *= self.color_weight
+        Qw = Q.copy()
+        Qw[:, :10] *= self.shape_weight
+        Qw[:, 10:] *= self.color_weight
+
+        d_sq = (np.einsum('ij,ij->i', P, P)[:, None] +
+                np.einsum('ij,ij->i', Qw, Qw)[None, :] -
+                2.0 * (P @ Qw.T))
+        # Cancellation can leave tiny negatives where the distance is ~0
+        np.maximum(d_sq, 0.0, out=d_sq)
+
+        t_sq = (None if distance_threshold is None
+                else distance_threshold * distance_threshold)
+        results = []
+        for m in range(Q.shape[0]):
+            col = d_sq[:, m]
+            if t_sq is not None:
+                candidates = np.nonzero(col <= t_sq)[0]
+            else:
+                candidates = np.arange(col.size)
+            if k < candidates.size:
+                candidates = np.sort(
+                    candidates[np.argpartition(col[candidates], k)[:k]])
+            order = np.argsort(col[candidates], kind='stable')
+            top = candidates[order]
+            d_top = np.sqrt(col[top])
+            results.append([(self.proto_ids[i], float(dist))
+                            for i, dist in zip(top, d_top)])
+        return results
 
     def get_or_add(
         self,
@@ -115,6 +389,48 @@ class ObjKNN:
             proto_id = self.add_object(v_object)
             return proto_id, True
 
+    def get_or_add_batch(
+        self,
+        v_objects: np.ndarray,
+        similarity_threshold: float = 0.5
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        get_or_add for a whole batch of vectors.
+
+        One query_batch GEMM resolves every vector that matches a
+        prototype already in the bank; only the leftovers fall back to
+        sequential get_or_add, so they still deduplicate against any
+        prototypes created earlier in the same batch. Vectors matched in
+        the bulk pass keep their batch-start assignment even if a
+        prototype added later in the batch ends up nearer.
+
+        Args:
+            v_objects: (N, 13) array of feature vectors
+            similarity_threshold: Maximum distance to consider as "same"
+
+        Returns:
+            (proto_ids, is_new) int64/bool arrays of length N
+        """
+        V = np.asarray(v_objects, dtype=np.float32)
+        if V.ndim == 1:
+            V = V[None, :]
+        n = V.shape[0]
+
+        proto_ids = np.empty(n, dtype=np.int64)
+        is_new = np.zeros(n, dtype=bool)
+        if n == 0:
+            return proto_ids, is_new
+
+        matches = self.query_batch(V, k=1,
+                                   distance_threshold=similarity_threshold)
+        for m, neighbors in enumerate(matches):
+            if neighbors:
+                proto_ids[m] = neighbors[0][0]
+            else:
+                proto_ids[m], is_new[m] = self.get_or_add(
+                    V[m], similarity_threshold)
+        return proto_ids, is_new
+
     def _weighted_distance(self, v1: np.ndarray, v2: np.ndarray) -> float:
         """
         Compute weighted Euclidean distance between two v_object vectors.
@@ -155,10 +471,8 @@ class ObjKNN:
         Returns:
             v_object vector or None if not found
         """
-        for i, pid in enumerate(self.proto_ids):
-            if pid == proto_id:
-                return self.prototypes[i].copy()
-        return None
+        row = self._row_by_id.get(proto_id)
+        return self._P[row].copy() if row is not None else None
 
     def get_all_prototypes(self) -> List[Tuple[int, np.ndarray]]:
         """
@@ -167,14 +481,19 @@ class ObjKNN:
         Returns:
             List of (proto_id, v_object) tuples
         """
-        return list(zip(self.proto_ids, self.prototypes))
+        return list(zip(self.proto_ids, self._P[:self._n]))
 
     def size(self) -> int:
         """Return number of prototypes in memory."""
-        return len(self.prototypes)
+        return self._n
 
     def clear(self):
         """Clear all prototypes from memory."""
-        self.prototypes.clear()
+        self._P = np.empty((0, 0), dtype=np.float32)
+        self._n = 0
+        self._index = None
+        self._Q = np.empty((0, 0), dtype=np.int8)
+        self._qscale = 0.0
         self.proto_ids.clear()
+        self._row_by_id.clear()
         self.next_proto_id = 0
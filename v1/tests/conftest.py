@@ -0,0 +1,35 @@
+"""
+Shared fixtures for the V1 test suite.
+"""
+
+import numpy as np
+import pytest
+
+from v1 import chain_filter
+from v1 import edge_filler
+from v1 import edge_runner
+from v1 import features
+from v1.utils import CellGrid
+
+
+@pytest.fixture(scope="session", autouse=True)
+def warm_pipeline():
+    """
+    Run the grid stages once on a tiny input before any test, so numba
+    kernel loading and NumPy type specialization are paid here rather
+    than inside whichever test happens to run first. Tests then measure
+    steady-state behavior.
+    """
+    grid = CellGrid(4, 4)
+    amap = np.zeros((4, 4), dtype=np.uint8)
+    amap[1, 1:4] = 1
+    grid.set_activation_map(amap)
+
+    filled = edge_filler.edge_filler(grid)
+    chains = edge_runner.extract_chains_from_grid(filled)
+    chain_filter.filter_chains(chains, 4, 4)
+    chain_filter.get_chain_statistics(chains)
+    features.extract_objects_from_chains(
+        chains, np.zeros((16, 16, 3), dtype=np.uint8), 4)
+
+    yield
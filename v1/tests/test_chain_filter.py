@@ -2,13 +2,9 @@
 Tests for Stage 4: Chain Filtering
 """
 
-import sys
-import os
 
-sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-
-import chain_filter
-import utils
+from v1 import chain_filter
+from v1 import utils
 
 
 def test_filter_loops():
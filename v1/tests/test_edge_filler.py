@@ -3,13 +3,9 @@ Tests for Stage 2: EdgeFiller
 """
 
 import numpy as np
-import sys
-import os
 
-sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-
-import edge_filler
-import utils
+from v1 import edge_filler
+from v1 import utils
 
 
 def test_horizontal_gap():
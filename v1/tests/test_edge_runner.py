@@ -3,13 +3,9 @@ Tests for Stage 3: Recursive EdgeRunner
 """
 
 import numpy as np
-import sys
-import os
 
-sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-
-import edge_runner
-import utils
+from v1 import edge_runner
+from v1 import utils
 
 
 def print_chain_info(chain, label="Chain"):
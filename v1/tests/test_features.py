@@ -3,13 +3,9 @@ Tests for Stage 5: Shape + Color Features
 """
 
 import numpy as np
-import sys
-import os
 
-sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-
-import features
-import utils
+from v1 import features
+from v1 import utils
 
 
 def test_shape_histogram():
@@ -3,13 +3,9 @@ Tests for Stage 7: Img-ID and Img-KNN
 """
 
 import numpy as np
-import sys
-import os
 
-sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-
-import img_id
-import obj_knn
+from v1 import img_id
+from v1 import obj_knn
 
 
 def test_scene_creation():
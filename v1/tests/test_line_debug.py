@@ -1,13 +1,9 @@
 """Debug simple line test."""
 
 import numpy as np
-import sys
-import os
 
-sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-
-import edge_runner
-from utils import CellGrid
+from v1 import edge_runner
+from v1.utils import CellGrid
 
 # Horizontal line (3 tiles)
 pattern = np.array([
@@ -1,13 +1,9 @@
 """Debug loop detection in EdgeRunner."""
 
 import numpy as np
-import sys
-import os
 
-sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-
-import edge_runner
-from utils import CellGrid
+from v1 import edge_runner
+from v1.utils import CellGrid
 
 # Simple 3x3 square loop
 pattern = np.array([
@@ -67,16 +63,19 @@ else:
     # Check all chains for potential loops
     for idx, chain in enumerate(chains):
         if len(chain.tiles) >= 2:
-            unique_tiles = set(chain.tiles)
-            if len(unique_tiles) < len(chain.tiles):
+            # Pack (row, col) into single ints and count in C instead of
+            # hashing tuples through a Counter
+            arr = np.asarray(chain.tiles, dtype=np.int64)
+            packed = arr[:, 0] * 65536 + arr[:, 1]
+            vals, counts = np.unique(packed, return_counts=True)
+            if vals.size < len(chain.tiles):
                 print(f"\nChain {idx} has duplicate tiles (potential loop):")
                 print(f"  Total tiles: {len(chain.tiles)}")
-                print(f"  Unique tiles: {len(unique_tiles)}")
+                print(f"  Unique tiles: {vals.size}")
                 print(f"  First tile: {chain.tiles[0]}")
                 print(f"  Last tile: {chain.tiles[-1]}")
 
-                # Find duplicates
-                from collections import Counter
-                tile_counts = Counter(chain.tiles)
-                duplicates = {t: count for t, count in tile_counts.items() if count > 1}
+                dup = counts > 1
+                duplicates = {(int(v) // 65536, int(v) % 65536): int(c)
+                              for v, c in zip(vals[dup], counts[dup])}
                 print(f"  Duplicates: {duplicates}")
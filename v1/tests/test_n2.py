@@ -3,14 +3,9 @@ Tests for Stage 1: N² Edge Neurons
 """
 
 import numpy as np
-import sys
-import os
 
-# Add parent directory to path
-sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-
-import n2_activation
-import utils
+from v1 import n2_activation
+from v1 import utils
 
 compute_activation_grid = n2_activation.compute_activation_grid
 visualize_activation = n2_activation.visualize_activation
@@ -62,12 +57,12 @@ def test_checkerboard_pattern():
     # Create checkerboard pattern at tile level
     image = np.zeros((64, 64, 3), dtype=np.uint8)
 
+    # Alternate black and white tiles: tile-level parity mask upscaled to
+    # pixels in one vectorized store
     tile_size = 4
-    for i in range(0, 64, tile_size):
-        for j in range(0, 64, tile_size):
-            # Alternate black and white tiles
-            if ((i // tile_size) + (j // tile_size)) % 2 == 0:
-                image[i:i+tile_size, j:j+tile_size, :] = 255
+    ti, tj = np.indices((16, 16))
+    mask = (ti + tj) % 2 == 0
+    image[np.repeat(np.repeat(mask, tile_size, axis=0), tile_size, axis=1)] = 255
 
     grid = compute_activation_grid(image, tile_size=4, threshold=30.0)
 
@@ -89,10 +84,10 @@ def test_diagonal_line():
     """Test detection of a diagonal edge."""
     image = np.zeros((64, 64, 3), dtype=np.uint8)
 
-    # Create diagonal white stripe
-    for i in range(64):
-        for j in range(max(0, i-4), min(64, i+4)):
-            image[i, j, :] = 255
+    # Create diagonal white stripe with a boolean band mask instead of
+    # per-pixel Python stores
+    ii, jj = np.ogrid[:64, :64]
+    image[(jj >= ii - 4) & (jj < ii + 4)] = 255
 
     grid = compute_activation_grid(image, tile_size=4, threshold=30.0)
 
@@ -2,13 +2,20 @@
 Debug test for N² activation
 """
 
-import numpy as np
-import sys
 import os
+import sys
 
-sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import numpy as np
 
-import n2_activation
+# Under pytest the root conftest.py puts the repo root on sys.path; when
+# this file is run directly we must do it ourselves before the package
+# import below.
+_REPO_ROOT = os.path.dirname(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+if _REPO_ROOT not in sys.path:
+    sys.path.insert(0, _REPO_ROOT)
+
+from v1 import n2_activation
 
 # Create black image with white square
 image = np.zeros((64, 64, 3), dtype=np.uint8)
@@ -21,21 +28,28 @@ print(f"White square pixels: rows 20-43, cols 20-43")
 print(f"In tiles: row {20//4}-{43//4}, col {20//4}-{43//4}")
 print(f"That's tile row 5-10, col 5-10")
 
-# Now compute activation and see what happens
-grid = n2_activation.compute_activation_grid(image, tile_size=4, threshold=30.0)
+# Now compute activation and see what happens. Default weights path is
+# cwd-relative; anchor it so the script runs from any working directory.
+grid = n2_activation.compute_activation_grid(
+    image,
+    weights_path=os.path.join(_REPO_ROOT, "v1", "n2_tile_weights.json"),
+    tile_size=4)
+
+# Let's check specific tiles: block-reshape the red channel and reduce
+# min/max over every tile in two calls instead of one pair per tile
+r = image[:, :, 0].reshape(16, tile_size, 16, tile_size)
+tile_min = r.min(axis=(1, 3))
+tile_max = r.max(axis=(1, 3))
+tile_var = tile_max - tile_min
 
-# Let's check specific tiles
 for i in range(4, 12):
     for j in range(4, 12):
-        y_start = i * tile_size
-        y_end = y_start + tile_size
-        x_start = j * tile_size
-        x_end = x_start + tile_size
-
-        tile = image[y_start:y_end, x_start:x_end, 0]  # Just red channel
-        variation = np.max(tile) - np.min(tile)
         activation = grid.cells[i][j].activation
 
-        if variation > 0 or activation > 0:
-            print(f"Tile ({i},{j}): pixels [{y_start}:{y_end}, {x_start}:{x_end}], "
-                  f"min={np.min(tile)}, max={np.max(tile)}, var={variation}, act={activation}")
+        if tile_var[i, j] > 0 or activation > 0:
+            y_start = i * tile_size
+            x_start = j * tile_size
+            print(f"Tile ({i},{j}): pixels [{y_start}:{y_start + tile_size}, "
+                  f"{x_start}:{x_start + tile_size}], "
+                  f"min={tile_min[i, j]}, max={tile_max[i, j]}, "
+                  f"var={tile_var[i, j]}, act={activation}")
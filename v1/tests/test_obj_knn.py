@@ -3,12 +3,15 @@ Tests for Stage 6: Obj-KNN (Object Memory)
 """
 
 import numpy as np
-import sys
-import os
+import pytest
 
-sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from v1 import obj_knn
 
-import obj_knn
+
+@pytest.fixture(scope="module")
+def proto_bank():
+    """One (10, 13) random prototype bank shared by the whole module."""
+    return np.random.rand(10, 13)
 
 
 def test_add_and_query():
@@ -16,9 +19,9 @@ def test_add_and_query():
     memory = obj_knn.ObjKNN()
 
     # Create some test objects
-    obj1 = np.array([1, 0, 0, 0, 0, 0, 0, 0, 0, 0, 255, 0, 0], dtype=float)  # Red square
-    obj2 = np.array([0, 1, 0, 0, 0, 0, 0, 0, 0, 0, 0, 255, 0], dtype=float)  # Green circle
-    obj3 = np.array([1, 0, 0, 0, 0, 0, 0, 0, 0, 0, 250, 5, 5], dtype=float)  # Similar to obj1
+    obj1 = np.array([1, 0, 0, 0, 0, 0, 0, 0, 0, 0, 255, 0, 0], dtype=np.float32)  # Red square
+    obj2 = np.array([0, 1, 0, 0, 0, 0, 0, 0, 0, 0, 0, 255, 0], dtype=np.float32)  # Green circle
+    obj3 = np.array([1, 0, 0, 0, 0, 0, 0, 0, 0, 0, 250, 5, 5], dtype=np.float32)  # Similar to obj1
 
     # Add objects
     id1 = memory.add_object(obj1)
@@ -50,13 +53,13 @@ def test_weighted_distance():
     memory = obj_knn.ObjKNN(shape_weight=1.0, color_weight=0.1)
 
     # Object with specific shape
-    obj_shape = np.array([1, 0, 0, 0, 0, 0, 0, 0, 0, 0, 100, 100, 100], dtype=float)
+    obj_shape = np.array([1, 0, 0, 0, 0, 0, 0, 0, 0, 0, 100, 100, 100], dtype=np.float32)
 
     # Object with same shape, different color
-    obj_diff_color = np.array([1, 0, 0, 0, 0, 0, 0, 0, 0, 0, 200, 200, 200], dtype=float)
+    obj_diff_color = np.array([1, 0, 0, 0, 0, 0, 0, 0, 0, 0, 200, 200, 200], dtype=np.float32)
 
     # Object with different shape, same color
-    obj_diff_shape = np.array([0, 1, 0, 0, 0, 0, 0, 0, 0, 0, 100, 100, 100], dtype=float)
+    obj_diff_shape = np.array([0, 1, 0, 0, 0, 0, 0, 0, 0, 0, 100, 100, 100], dtype=np.float32)
 
     memory.add_object(obj_diff_color, proto_id=1)
     memory.add_object(obj_diff_shape, proto_id=2)
@@ -82,9 +85,9 @@ def test_get_or_add():
     """Test get_or_add functionality."""
     memory = obj_knn.ObjKNN()
 
-    obj1 = np.array([1, 0, 0, 0, 0, 0, 0, 0, 0, 0, 255, 0, 0], dtype=float)
-    obj2 = np.array([1, 0, 0, 0, 0, 0, 0, 0, 0, 0, 250, 5, 5], dtype=float)  # Similar
-    obj3 = np.array([0, 0, 0, 1, 0, 0, 0, 0, 0, 0, 0, 0, 255], dtype=float)  # Different
+    obj1 = np.array([1, 0, 0, 0, 0, 0, 0, 0, 0, 0, 255, 0, 0], dtype=np.float32)
+    obj2 = np.array([1, 0, 0, 0, 0, 0, 0, 0, 0, 0, 250, 5, 5], dtype=np.float32)  # Similar
+    obj3 = np.array([0, 0, 0, 1, 0, 0, 0, 0, 0, 0, 0, 0, 255], dtype=np.float32)  # Different
 
     # Add first object
     id1, is_new1 = memory.get_or_add(obj1, similarity_threshold=1.0)
@@ -112,7 +115,7 @@ def test_get_prototype():
     """Test retrieving prototypes by ID."""
     memory = obj_knn.ObjKNN()
 
-    obj1 = np.array([1, 2, 3, 4, 5, 6, 7, 8, 9, 10, 11, 12, 13], dtype=float)
+    obj1 = np.array([1, 2, 3, 4, 5, 6, 7, 8, 9, 10, 11, 12, 13], dtype=np.float32)
     id1 = memory.add_object(obj1)
 
     retrieved = memory.get_prototype(id1)
@@ -129,14 +132,13 @@ def test_get_prototype():
     print("✓ test_get_prototype passed")
 
 
-def test_clear():
+def test_clear(proto_bank):
     """Test clearing memory."""
     memory = obj_knn.ObjKNN()
 
-    # Add some objects
-    for i in range(5):
-        obj = np.random.rand(13)
-        memory.add_object(obj)
+    # Bulk insert: one contiguous copy instead of 5 appends
+    ids = memory.add_objects(proto_bank[:5])
+    assert len(ids) == 5
 
     print(f"\nSize before clear: {memory.size()}")
     assert memory.size() == 5
@@ -149,14 +151,12 @@ def test_clear():
     print("✓ test_clear passed")
 
 
-def test_k_nearest():
+def test_k_nearest(proto_bank):
     """Test k-nearest neighbors query."""
     memory = obj_knn.ObjKNN()
 
-    # Add several objects
-    for i in range(10):
-        obj = np.random.rand(13)
-        memory.add_object(obj)
+    memory.add_objects(proto_bank)
+    assert memory.size() == 10
 
     query_obj = np.random.rand(13)
 
@@ -195,13 +195,38 @@ def test_distance_threshold():
     print("✓ test_distance_threshold passed")
 
 
+def test_query_batch_matches_query():
+    """Test that the batched query path agrees with per-query results."""
+    memory = obj_knn.ObjKNN()
+
+    rng = np.random.default_rng(0)
+    for obj in rng.random((10, 13)):
+        memory.add_object(obj)
+
+    queries = rng.random((5, 13))
+
+    batched = memory.query_batch(queries, k=3, distance_threshold=2.0)
+    assert len(batched) == 5, "Should return one result list per query"
+
+    for q, batch_result in zip(queries, batched):
+        single_result = memory.query(q, k=3, distance_threshold=2.0)
+        assert [pid for pid, _ in batch_result] == \
+               [pid for pid, _ in single_result], "IDs should match query()"
+        for (_, d_batch), (_, d_single) in zip(batch_result, single_result):
+            assert np.isclose(d_batch, d_single), "Distances should match"
+
+    print("✓ test_query_batch_matches_query passed")
+
+
 if __name__ == "__main__":
     print("Running Obj-KNN tests...\n")
     test_add_and_query()
     test_weighted_distance()
     test_get_or_add()
     test_get_prototype()
-    test_clear()
-    test_k_nearest()
+    bank = np.random.rand(10, 13)
+    test_clear(bank)
+    test_k_nearest(bank)
     test_distance_threshold()
+    test_query_batch_matches_query()
     print("\n✅ All Obj-KNN tests passed!")
@@ -1,13 +1,9 @@
 """Test with a simpler loop pattern - a thin ring with no branching."""
 
 import numpy as np
-import sys
-import os
 
-sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-
-import edge_runner
-from utils import CellGrid
+from v1 import edge_runner
+from v1.utils import CellGrid
 
 # Create a simple loop: a horizontal line that wraps
 # This should force a loop because there's no branching
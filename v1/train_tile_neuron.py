@@ -54,8 +54,7 @@ def main():
 
     # Validate by computing final accuracy
     print("\nValidation:")
-    X_flat = np.array([neuron._flatten_patch(p) for p in patches])
-    predictions = neuron._predict_batch(X_flat)
+    predictions = neuron._predict_batch(neuron._flatten_batch(patches))
     accuracy = np.mean(predictions == labels)
     print(f"  Final training accuracy: {accuracy*100:.2f}%")
 
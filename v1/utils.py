@@ -2,18 +2,81 @@
 Common data structures and utilities for the V1 pipeline.
 """
 
+import functools
+
 import numpy as np
 from dataclasses import dataclass, field
 from typing import List, Tuple, Optional
 
 
-@dataclass
 class Cell:
-    """Represents a single tile in the grid."""
-    activation: int = 0           # 0 or 1: is this an edge tile
-    visited: int = 0              # 0 or 1: has EdgeRunner walked through this
-    chain_id: int = -1            # which chain first claimed this tile
-    index_in_chain: int = -1      # index of this tile in that chain
+    """
+    Represents a single tile in the grid.
+
+    All per-tile state lives in the parent grid's contiguous SoA arrays;
+    this object is a lightweight view bound to one (i, j) position.
+    """
+
+    __slots__ = ('_grid', '_i', '_j')
+
+    def __init__(self, grid: 'CellGrid', i: int, j: int):
+        self._grid = grid
+        self._i = i
+        self._j = j
+
+    @property
+    def activation(self) -> int:
+        """0 or 1: is this an edge tile."""
+        return int(self._grid._activation[self._i, self._j])
+
+    @activation.setter
+    def activation(self, value: int):
+        self._grid._activation[self._i, self._j] = value
+
+    @property
+    def visited(self) -> int:
+        """0 or 1: has EdgeRunner walked through this."""
+        return int(self._grid._visited[self._i, self._j])
+
+    @visited.setter
+    def visited(self, value: int):
+        self._grid._visited[self._i, self._j] = value
+
+    @property
+    def chain_id(self) -> int:
+        """Which chain first claimed this tile (-1 if unclaimed)."""
+        return int(self._grid._chain_id[self._i, self._j])
+
+    @chain_id.setter
+    def chain_id(self, value: int):
+        self._grid._chain_id[self._i, self._j] = value
+
+    @property
+    def index_in_chain(self) -> int:
+        """Index of this tile in that chain (-1 if unclaimed)."""
+        return int(self._grid._index_in_chain[self._i, self._j])
+
+    @index_in_chain.setter
+    def index_in_chain(self, value: int):
+        self._grid._index_in_chain[self._i, self._j] = value
+
+
+class _CellRows:
+    """Lazily materializes rows of Cell views on first access."""
+
+    def __init__(self, grid: 'CellGrid'):
+        self._grid = grid
+        self._rows: List[Optional[List[Cell]]] = [None] * grid.height
+
+    def __getitem__(self, i: int) -> List[Cell]:
+        row = self._rows[i]
+        if row is None:
+            row = [Cell(self._grid, i, j) for j in range(self._grid.width)]
+            self._rows[i] = row
+        return row
+
+    def __len__(self) -> int:
+        return self._grid.height
 
 
 class CellGrid:
@@ -22,7 +85,19 @@ class CellGrid:
     def __init__(self, height: int, width: int):
         self.height = height
         self.width = width
-        self.cells = [[Cell() for _ in range(width)] for _ in range(height)]
+        # SoA backing: four dense parallel arrays instead of one Python
+        # object per tile. Cell views are only built for tiles actually touched.
+        self._activation = np.zeros((height, width), dtype=np.uint8)
+        self._visited = np.zeros((height, width), dtype=np.uint8)
+        self._chain_id = np.full((height, width), -1, dtype=np.int32)
+        self._index_in_chain = np.full((height, width), -1, dtype=np.int32)
+        # Lazily-created read-only view handed out by get_activation_map
+        self._activation_view: Optional[np.ndarray] = None
+        # Lazily-built per-cell neighbor tables (see neighbor_table /
+        # flat_neighbor_table)
+        self._neighbor_table = None
+        self._flat_neighbor_table = None
+        self.cells = _CellRows(self)
 
     def __getitem__(self, pos: Tuple[int, int]) -> Cell:
         i, j = pos
@@ -31,26 +106,79 @@ class CellGrid:
     def in_bounds(self, i: int, j: int) -> bool:
         return 0 <= i < self.height and 0 <= j < self.width
 
+    def neighbor_table(self) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Return ((H, W, 8, 2) neighbor coordinates, (H, W, 8) validity mask),
+        in DIRECTION_VECTORS order. Built vectorized on first use so hot
+        loops can index neighbors without per-step bounds checks or list
+        allocations.
+        """
+        if self._neighbor_table is None:
+            di = np.array([d[0] for d in DIRECTION_VECTORS], dtype=np.int32)
+            dj = np.array([d[1] for d in DIRECTION_VECTORS], dtype=np.int32)
+            ii = np.broadcast_to(
+                np.arange(self.height, dtype=np.int32)[:, None],
+                (self.height, self.width))
+            jj = np.broadcast_to(
+                np.arange(self.width, dtype=np.int32)[None, :],
+                (self.height, self.width))
+            ni = ii[:, :, None] + di
+            nj = jj[:, :, None] + dj
+            valid = ((ni >= 0) & (ni < self.height) &
+                     (nj >= 0) & (nj < self.width))
+            self._neighbor_table = (np.stack([ni, nj], axis=-1), valid)
+        return self._neighbor_table
+
+    def flat_neighbor_table(self) -> np.ndarray:
+        """
+        Return an (H*W, 8) int32 table of flat neighbor indices (i*W + j),
+        in DIRECTION_VECTORS order, with -1 where the neighbor is out of
+        bounds. Flat indices let hot loops track positions as single ints
+        instead of allocating an (i, j) tuple per step.
+        """
+        if self._flat_neighbor_table is None:
+            coords, valid = self.neighbor_table()
+            flat = coords[..., 0] * self.width + coords[..., 1]
+            self._flat_neighbor_table = np.where(
+                valid, flat, -1).astype(np.int32).reshape(-1, 8)
+        return self._flat_neighbor_table
+
     def get_activation_map(self) -> np.ndarray:
-        """Return 2D array of activation values."""
-        return np.array([[self.cells[i][j].activation
-                         for j in range(self.width)]
-                        for i in range(self.height)])
+        """
+        Return 2D array of activation values.
+
+        This is a zero-copy read-only view of the live array (it always
+        reflects the current grid); callers that want to mutate it must
+        copy, e.g. with .astype or .copy().
+        """
+        if self._activation_view is None:
+            view = self._activation.view()
+            view.flags.writeable = False
+            self._activation_view = view
+        return self._activation_view
 
     def set_activation_map(self, activation_map: np.ndarray):
         """Set activation values from 2D array."""
-        for i in range(self.height):
-            for j in range(self.width):
-                self.cells[i][j].activation = int(activation_map[i, j])
+        np.copyto(self._activation, activation_map, casting='unsafe')
 
 
-@dataclass
+@dataclass(slots=True)
 class Chain:
     """Represents a boundary chain with direction codes and tile positions."""
     steps: List[Tuple[int, float]] = field(default_factory=list)  # [(code, distance), ...]
     tiles: List[Tuple[int, int]] = field(default_factory=list)    # [(i, j), ...]
     chain_id: int = -1
     spliced: bool = False  # True if this chain ended via splicing
+    # Memo caches (see step_distances and features.py); excluded from
+    # equality and repr — they describe derived state, not the chain
+    _dist_cache: Optional[tuple] = field(default=None, init=False,
+                                         repr=False, compare=False)
+    _shape_cache: Optional[tuple] = field(default=None, init=False,
+                                          repr=False, compare=False)
+    _vobj_cache: Optional[tuple] = field(default=None, init=False,
+                                         repr=False, compare=False)
+    _tiles_cache: Optional[tuple] = field(default=None, init=False,
+                                          repr=False, compare=False)
 
     def __len__(self):
         """Return number of tiles in chain (more intuitive than step count)."""
@@ -76,6 +204,31 @@ class Chain:
         """Check if chain forms a closed loop."""
         return len(self.tiles) >= 2 and self.start_pos == self.end_pos
 
+    def step_distances(self) -> np.ndarray:
+        """
+        Step distances as one float64 array, cached by step count so
+        repeated reductions (perimeter etc.) don't rebuild it.
+        """
+        cached = self._dist_cache
+        if cached is not None and cached[0] == len(self.steps):
+            return cached[1]
+        arr = np.fromiter((s[1] for s in self.steps), dtype=np.float64,
+                          count=len(self.steps))
+        self._dist_cache = (len(self.steps), arr)
+        return arr
+
+    def tiles_array(self) -> np.ndarray:
+        """
+        Tile positions as one (N, 2) int32 array, cached by tile count so
+        per-chain feature passes don't re-walk the tuple list.
+        """
+        cached = self._tiles_cache
+        if cached is not None and cached[0] == len(self.tiles):
+            return cached[1]
+        arr = np.asarray(self.tiles, dtype=np.int32).reshape(-1, 2)
+        self._tiles_cache = (len(self.tiles), arr)
+        return arr
+
 
 # Direction encoding: 8 compass directions as absolute directions
 # N=0, NE=1, E=2, SE=3, S=4, SW=5, W=6, NW=7
@@ -93,6 +246,21 @@ DIRECTION_VECTORS = [
 ORTHOGONAL_DIRS = {0, 2, 4, 6}
 DIAGONAL_DIRS = {1, 3, 5, 7}
 
+# Static lookup tables for the scalar helpers below. Both input domains
+# are tiny enumerations (offsets in {-1,0,1}, dir codes in 0..7), so one
+# table index replaces the per-call scan/branch work. 255 marks (di, dj)
+# offsets that are not 8-neighbor steps.
+_DIR_BY_OFFSET = [[255] * 3 for _ in range(3)]
+for _code, (_di, _dj) in enumerate(DIRECTION_VECTORS):
+    _DIR_BY_OFFSET[_di + 1][_dj + 1] = _code
+_DIR_BY_OFFSET = tuple(tuple(row) for row in _DIR_BY_OFFSET)
+
+# Orthogonal and diagonal codes alternate, so the distances do too
+_DIST_BY_DIR = (1.0, float(np.sqrt(2))) * 4
+
+# Turn code indexed by (new_dir - prev_dir) % 8
+_TURN_BY_DIFF = (0, 1, 3, 5, 7, 6, 4, 2)
+
 
 def get_direction(from_pos: Tuple[int, int], to_pos: Tuple[int, int]) -> int:
     """
@@ -102,8 +270,9 @@ def get_direction(from_pos: Tuple[int, int], to_pos: Tuple[int, int]) -> int:
     di = to_pos[0] - from_pos[0]
     dj = to_pos[1] - from_pos[1]
 
-    for dir_code, (ddi, ddj) in enumerate(DIRECTION_VECTORS):
-        if di == ddi and dj == ddj:
+    if -1 <= di <= 1 and -1 <= dj <= 1:
+        dir_code = _DIR_BY_OFFSET[di + 1][dj + 1]
+        if dir_code != 255:
             return dir_code
 
     raise ValueError(f"Positions {from_pos} and {to_pos} are not 8-connected neighbors")
@@ -111,12 +280,9 @@ def get_direction(from_pos: Tuple[int, int], to_pos: Tuple[int, int]) -> int:
 
 def get_distance(dir_code: int) -> float:
     """Get distance for a direction code: 1.0 for orthogonal, sqrt(2) for diagonal."""
-    if dir_code in ORTHOGONAL_DIRS:
-        return 1.0
-    elif dir_code in DIAGONAL_DIRS:
-        return np.sqrt(2)
-    else:
-        raise ValueError(f"Invalid direction code: {dir_code}")
+    if 0 <= dir_code <= 7:
+        return _DIST_BY_DIR[dir_code]
+    raise ValueError(f"Invalid direction code: {dir_code}")
 
 
 def compute_turn_code(prev_dir: int, new_dir: int) -> int:
@@ -132,32 +298,29 @@ def compute_turn_code(prev_dir: int, new_dir: int) -> int:
     6: big left (-135°)
     7: U-turn (±180°)
     """
-    # Compute the difference in direction codes
-    diff = (new_dir - prev_dir) % 8
+    return _TURN_BY_DIFF[(new_dir - prev_dir) & 7]
 
-    # Map difference to turn codes
-    turn_map = {
-        0: 0,  # straight
-        1: 1,  # small right (+45°)
-        2: 3,  # medium right (+90°)
-        3: 5,  # big right (+135°)
-        4: 7,  # U-turn (180°)
-        5: 6,  # big left (-135°)
-        6: 4,  # medium left (-90°)
-        7: 2,  # small left (-45°)
-    }
 
-    return turn_map[diff]
+def chain_lengths(chains: List[Chain]) -> np.ndarray:
+    """Tile counts of the given chains as one int32 array."""
+    return np.fromiter((len(c.tiles) for c in chains), dtype=np.int32,
+                       count=len(chains))
 
 
-def get_neighbors_8(pos: Tuple[int, int], grid: CellGrid) -> List[Tuple[int, int]]:
-    """Get all 8-connected neighbors that are in bounds."""
-    i, j = pos
-    neighbors = []
+@functools.lru_cache(maxsize=None)
+def _neighbors_cached(i: int, j: int, h: int, w: int) -> Tuple[Tuple[int, int], ...]:
+    """In-bounds 8-neighbors of (i, j) on an h x w grid, memoized.
+
+    The answer only depends on the position and grid shape, and positions
+    repeat heavily across traversals, so each distinct query is built once.
+    """
+    return tuple((i + di, j + dj) for di, dj in DIRECTION_VECTORS
+                 if 0 <= i + di < h and 0 <= j + dj < w)
 
-    for di, dj in DIRECTION_VECTORS:
-        ni, nj = i + di, j + dj
-        if grid.in_bounds(ni, nj):
-            neighbors.append((ni, nj))
 
-    return neighbors
+def get_neighbors_8(pos: Tuple[int, int], grid: CellGrid) -> List[Tuple[int, int]]:
+    """Get all 8-connected neighbors that are in bounds."""
+    # Fresh list per call so callers may mutate it; the cached tuple holds
+    # the bounds-check work. Bulk consumers should prefer
+    # CellGrid.neighbor_table / flat_neighbor_table.
+    return list(_neighbors_cached(pos[0], pos[1], grid.height, grid.width))